@@ -40,7 +40,8 @@ class ActionModule(ActionNetworkModule):
         persistent_connection = self._play_context.connection.split(".")[-1]
         warnings = []
 
-        if persistent_connection != "network_cli":
+        # a module reading a stored snapshot opens no connection
+        if persistent_connection != "network_cli" and not self._task.args.get("offline_source"):
             return {
                 "failed": True,
                 "msg": "Connection type %s is not valid for this module"
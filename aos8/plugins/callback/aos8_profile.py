@@ -0,0 +1,283 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+author:
+- Samuel Yip (@samuelyip74)
+name: aos8_profile
+type: aggregate
+short_description: Profile the alcatel.aos8 tasks per host, module and phase
+description:
+- Times each alcatel.aos8 task on each host and splits its time into phases with the
+  I(timing) the resource modules return, that is the time they spend gathering the
+  facts (facts), computing the commands (diff), pushing them (push) and saving the
+  configuration (write_memory and flash_synchro).
+- The rest of the task time is the module startup (startup), that is the worker,
+  the transfer and the imports of the module and the connection to the device, the
+  SSH login included. It is the whole task for the modules which return no timing.
+- At the end of the playbook the slowest hosts, the phases and the modules are shown,
+  with the share of the controller (diff), of the device and the link to it (facts,
+  push, write_memory and flash_synchro) and of the startup and connection (startup).
+  The startup mixes controller and network time, so it is counted in neither.
+version_added: 1.0.0
+requirements:
+- enable in configuration, for example with C(callbacks_enabled = alcatel.aos8.aos8_profile)
+options:
+  top:
+    description:
+    - The number of slowest hosts shown.
+    type: int
+    default: 10
+    env:
+    - name: ANSIBLE_AOS8_PROFILE_TOP
+    ini:
+    - section: callback_aos8_profile
+      key: top
+  output:
+    description:
+    - The JSON file the task runs and the totals per host and module are written to.
+    type: path
+    env:
+    - name: ANSIBLE_AOS8_PROFILE_OUTPUT
+    ini:
+    - section: callback_aos8_profile
+      key: output
+  trace:
+    description:
+    - The Chrome trace file the task runs are written to, one process per host, which
+      can be opened in chrome://tracing or Perfetto.
+    - The modules only return the total of each phase, so the phases of a task are
+      drawn one after the other.
+    type: path
+    env:
+    - name: ANSIBLE_AOS8_PROFILE_TRACE
+    ini:
+    - section: callback_aos8_profile
+      key: trace
+"""
+
+import json
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+
+# The phases in the order they run, then how they are shared
+PHASES = ("startup", "facts", "diff", "push", "write_memory", "flash_synchro")
+CONTROLLER_PHASES = ("diff",)
+DEVICE_PHASES = ("facts", "push", "write_memory", "flash_synchro")
+
+
+class CallbackModule(CallbackBase):
+    """
+    Profile the alcatel.aos8 tasks per host, module and phase
+    """
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "alcatel.aos8.aos8_profile"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display=display)
+        self._starts = {}
+        self.runs = []
+
+    @staticmethod
+    def _is_aos8(task):
+        # the resolved action of the modules is the alcatel.aos8.aos8 action plugin
+        return any(
+            action.startswith("alcatel.aos8.") or action.startswith("aos8_")
+            for action in (task.action, getattr(task, "resolved_action", None) or "")
+        )
+
+    @staticmethod
+    def _timing(result):
+        # the timing of a loop is the sum of the timing of its items
+        timing = {}
+        for each in result.get("results") or [result]:
+            if isinstance(each, dict):
+                for phase, seconds in (each.get("timing") or {}).items():
+                    timing[phase] = timing.get(phase, 0.0) + seconds
+        return timing
+
+    def v2_runner_on_start(self, host, task):
+        if self._is_aos8(task):
+            self._starts[(host.get_name(), task._uuid)] = time.time()
+
+    def _record(self, result, status):
+        host = result._host.get_name()
+        task = result._task
+        start = self._starts.pop((host, task._uuid), None)
+        if start is None:
+            return
+        duration = time.time() - start
+
+        phases = self._timing(result._result)
+        phases["startup"] = max(duration - sum(phases.values()), 0.0)
+        self.runs.append(
+            {
+                "host": host,
+                "task": task.get_name(),
+                "module": task.action,
+                "status": status,
+                "start": start,
+                "duration": duration,
+                "phases": phases,
+            },
+        )
+
+    def v2_runner_on_ok(self, result):
+        self._record(result, "ok")
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result, "failed")
+
+    def v2_runner_on_unreachable(self, result):
+        self._record(result, "unreachable")
+
+    def v2_runner_on_skipped(self, result):
+        self._record(result, "skipped")
+
+    def totals(self):
+        """
+        Sums the task runs per host and per module
+        :return: the totals keyed by host and keyed by module, each with its
+                 number of tasks, its duration and the duration of each phase
+        """
+        hosts = {}
+        modules = {}
+        for run in self.runs:
+            for totals, key in ((hosts, run["host"]), (modules, run["module"])):
+                total = totals.setdefault(
+                    key,
+                    {"tasks": 0, "duration": 0.0, "phases": dict((phase, 0.0) for phase in PHASES)},
+                )
+                total["tasks"] += 1
+                total["duration"] += run["duration"]
+                for phase, seconds in run["phases"].items():
+                    total["phases"][phase] = total["phases"].get(phase, 0.0) + seconds
+        return hosts, modules
+
+    def v2_playbook_on_stats(self, stats):
+        if not self.runs:
+            return
+        hosts, modules = self.totals()
+
+        self._display.banner("AOS8 PROFILE")
+        row = "{0:<30}{1:>7}{2:>10}" + "".join("{%d:>14}" % (index + 3) for index in range(len(PHASES)))
+        self._display.display(row.format("host", "tasks", "total", *PHASES))
+        slowest = sorted(hosts.items(), key=lambda item: -item[1]["duration"])
+        for host, total in slowest[: self.get_option("top")]:
+            self._display.display(
+                row.format(
+                    host,
+                    total["tasks"],
+                    "%.2fs" % total["duration"],
+                    *["%.2fs" % total["phases"].get(phase, 0.0) for phase in PHASES]
+                ),
+            )
+
+        duration = sum(total["duration"] for total in hosts.values()) or 1.0
+        phases = dict(
+            (phase, sum(total["phases"].get(phase, 0.0) for total in hosts.values()))
+            for phase in PHASES
+        )
+        self._display.display("")
+        for phase, seconds in sorted(phases.items(), key=lambda item: -item[1]):
+            self._display.display(
+                "{0:<30}{1:>10}{2:>8}".format(phase, "%.2fs" % seconds, "%.1f%%" % (100 * seconds / duration)),
+            )
+        controller = sum(phases[phase] for phase in CONTROLLER_PHASES)
+        device = sum(phases[phase] for phase in DEVICE_PHASES)
+        self._display.display(
+            "controller (diff) %.1f%%, device and link (facts, push, write_memory, flash_synchro) %.1f%%, "
+            "startup and connection (startup) %.1f%%"
+            % (100 * controller / duration, 100 * device / duration, 100 * phases["startup"] / duration),
+        )
+
+        self._display.display("")
+        for module, total in sorted(modules.items(), key=lambda item: -item[1]["duration"]):
+            self._display.display(
+                "{0:<40}{1:>7}{2:>10}{3:>12}".format(
+                    module,
+                    total["tasks"],
+                    "%.2fs" % total["duration"],
+                    "%.3fs/task" % (total["duration"] / total["tasks"]),
+                ),
+            )
+
+        if self.get_option("output"):
+            self.write_output(self.get_option("output"), hosts, modules)
+        if self.get_option("trace"):
+            self.write_trace(self.get_option("trace"))
+
+    def write_output(self, path, hosts, modules):
+        with open(path, "w") as output:
+            json.dump(
+                {"runs": self.runs, "hosts": hosts, "modules": modules},
+                output,
+                indent=2,
+                sort_keys=True,
+            )
+
+    def write_trace(self, path):
+        """
+        Writes the task runs in the Chrome trace event format, the tasks on
+        the first thread of the process of their host and their phases on
+        the second one
+        """
+        origin = min(run["start"] for run in self.runs)
+        pids = {}
+        events = []
+        for run in self.runs:
+            if run["host"] not in pids:
+                pids[run["host"]] = len(pids) + 1
+                events.append(
+                    {
+                        "name": "process_name",
+                        "ph": "M",
+                        "pid": pids[run["host"]],
+                        "args": {"name": run["host"]},
+                    },
+                )
+            pid = pids[run["host"]]
+            start = (run["start"] - origin) * 1e6
+            events.append(
+                {
+                    "name": run["task"],
+                    "cat": run["module"],
+                    "ph": "X",
+                    "ts": start,
+                    "dur": run["duration"] * 1e6,
+                    "pid": pid,
+                    "tid": 1,
+                    "args": {"status": run["status"]},
+                },
+            )
+            for phase in PHASES:
+                seconds = run["phases"].get(phase)
+                if not seconds:
+                    continue
+                events.append(
+                    {
+                        "name": phase,
+                        "cat": run["module"],
+                        "ph": "X",
+                        "ts": start,
+                        "dur": seconds * 1e6,
+                        "pid": pid,
+                        "tid": 2,
+                    },
+                )
+                start += seconds * 1e6
+        with open(path, "w") as trace:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace)
@@ -49,6 +49,36 @@ options:
     - name: ANSIBLE_AOS_FLASH_SYNCHRO_FLAG
     vars:
     - name: ansible_aos_flash_synchro_flag    
+  journal_dir:
+    type: str
+    default: ~/.ansible/aos8_journal
+    description:
+    - Directory on the controller where edit_config keeps, for each host, the journal
+      of the configuration being pushed, that is the commands, their hash and the
+      index of the last command acknowledged by the device.
+    - The journal is removed once the configuration has been applied and saved, it
+      allows the resource modules to resume an interrupted push with I(resume=true).
+    - Set to an empty string to disable the journal.
+    env:
+    - name: ANSIBLE_AOS_JOURNAL_DIR
+    vars:
+    - name: ansible_aos_journal_dir
+  rollback_on_error:
+    type: boolean
+    default: false
+    description:
+    - True or false to revert the commands already applied when the device rejects a
+      command of the configuration, using the inverse commands provided with each line
+      of the candidate under the I(rollback) key.
+    - The configuration is not saved when it has been rolled back.
+    - The VLAN memberships of the device are collected before the push when the
+      configuration deletes VLANs, so that their ports are restored with them.
+    - A failure of the SSH session is not rolled back, the push can be resumed with the
+      I(resume) option of the resource modules.
+    env:
+    - name: ANSIBLE_AOS_ROLLBACK_ON_ERROR
+    vars:
+    - name: ansible_aos_rollback_on_error
 
 """
 
@@ -58,6 +88,7 @@ EXAMPLES = """
   vars:
     ansible_aos_write_memory_flash: true
     ansible_aos_flash_synchro_flag: false
+    ansible_aos_rollback_on_error: true
   tasks:
     - name: "Commit confirmed with timeout"
       alcatel.aos8.aos8_hostname:
@@ -67,7 +98,9 @@ EXAMPLES = """
 
 """
 
+import hashlib
 import json
+import os
 import re
 import time
 
@@ -84,10 +117,31 @@ from ansible_collections.ansible.netcommon.plugins.plugin_utils.cliconf_base imp
     CliconfBase,
 )
 
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.parsers.parsers import (
+    parse_output,
+    parse_show_system,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import (
+    to_member_record,
+    vlan_members_rollback,
+)
+
+
+SYSTEM_NAME_RE = re.compile(r"^\s*(no\s+)?system\s+name\b")
+# The errors of a command sent again which show it was already applied: the
+# VLAN it creates exists, or the VLAN or membership it removes does not. A
+# VPA conflict is not one, the port is a member of the VLAN in another mode.
+ALREADY_EXISTS_RE = re.compile(r"ERROR: VLAN \d+ already exists", re.I)
+ALREADY_REMOVED_RE = re.compile(r"ERROR: (?:VLAN \d+|VPA) does not exist", re.I)
+# The error lines of the device rejecting a command, any other error of the
+# terminal plugin, such as a timed out connection, is a transport failure
+CLI_ERROR_RE = re.compile(r"^\s*ERROR: ", re.M)
+
 
 class Cliconf(CliconfBase):
     def __init__(self, *args, **kwargs):
         self._device_info = {}
+        self._last_rollback = []
         super(Cliconf, self).__init__(*args, **kwargs)
 
     def get_config(self, source="running", flags=None, format=None):
@@ -195,44 +249,224 @@ class Cliconf(CliconfBase):
     #     diff["banner_diff"] = banners if banners else {}
     #     return diff
 
-    def edit_config(self, candidate=None, commit=True, replace=None, comment=None):
+    def edit_config(self, candidate=None, commit=True, replace=None, comment=None, resume=False,
+                    journal_key=None):
         resp = {}
+        start = 0
+        if resume:
+            # continue the push recorded in the journal by the same module
+            # towards the same configuration, if any
+            journal = self.load_journal(journal_key)
+            if journal is None:
+                resp["request"] = []
+                resp["response"] = []
+                return resp
+            candidate = journal["candidate"]
+            commit = journal["commit"]
+            start = journal["index"]
+            resp["resumed"] = True
+
         operations = self.get_device_operations()
         self.check_edit_config_capability(operations, candidate, commit, replace, comment)
 
         results = []
         requests = []
+        # the time of the steps after the push, for the timing of the modules
+        timing = {}
 
         device_running_directory_state = self.check_running_directory()
         # check if device is running configuration from working directory.
         if device_running_directory_state is None:
             raise ValueError("Device not ready!")
         elif device_running_directory_state == "WORKING":
+            lines = []
             for line in to_list(candidate):
                 if not isinstance(line, Mapping):
                     line = {"command": line}
                 cmd = line["command"]
                 if cmd != "exit" and cmd[0] != "!":
-                    results.append(self.send_command(**line))
-                    requests.append(cmd) 
-
-            if commit:      
-                # save configuration into flash (working directory) if write_memory_flag: true
-                if self.get_option("write_memory_flag"):
-                    self.write_memory()
-
-                # copy working directory to certify directory if  flash_synchro_flag: true
-                if self.get_option("flash_synchro_flag"):
-                    self.flash_sychro()
-             
-  
+                    lines.append(dict(line))
+            self._reset_device_info(line["command"] for line in lines)
+
+            journal = self.open_journal(lines, commit, append=resume, key=journal_key)
+            rollback = [to_list(line.get("rollback")) for line in lines[:start]]
+            vlan_members = None
+            if self.get_option("rollback_on_error") and any("members" in line for line in lines[start:]):
+                # the memberships of the VLANs the push deletes, for its rollback
+                vlan_members = self._vlan_members()
+            # the journal is kept when the push fails, so that it can be resumed
+            remove_journal = False
+            try:
+                for index in range(start, len(lines)):
+                    line = dict(lines[index])
+                    undo = to_list(line.pop("rollback", None))
+                    vlan_range = line.pop("members", None)
+                    if vlan_range and vlan_members is not None:
+                        undo = undo + vlan_members_rollback(vlan_range, vlan_members)
+                    cmd = line["command"]
+                    try:
+                        results.append(self.send_command(**line))
+                    except AnsibleConnectionFailure as exc:
+                        if resume and index == start and self._already_applied(cmd, exc):
+                            # the command in flight when the push was interrupted
+                            # was applied, as the device error confirms
+                            results.append(to_text(exc))
+                        elif not self.get_option("rollback_on_error") or not self._is_cli_error(exc):
+                            # a transport failure leaves no session to roll back
+                            # over, the journal is kept to resume the push
+                            raise
+                        else:
+                            errors = self.rollback_config(rollback)
+                            remove_journal = True
+                            raise AnsibleConnectionFailure(
+                                "%s, %d applied command(s) rolled back%s"
+                                % (
+                                    to_text(exc),
+                                    len(rollback),
+                                    " with errors: %s" % "; ".join(errors) if errors else "",
+                                ),
+                            )
+                    requests.append(cmd)
+                    rollback.append(undo)
+                    if journal:
+                        journal.write("%d\n" % (index + 1))
+                        journal.flush()
+                self._last_rollback = rollback
+
+                if commit:
+                    # save configuration into flash (working directory) if write_memory_flag: true
+                    if self.get_option("write_memory_flag"):
+                        started = time.time()
+                        self.write_memory()
+                        timing["write_memory"] = time.time() - started
+
+                    # copy working directory to certify directory if  flash_synchro_flag: true
+                    if self.get_option("flash_synchro_flag"):
+                        started = time.time()
+                        self.flash_sychro()
+                        timing["flash_synchro"] = time.time() - started
+                remove_journal = True
+            finally:
+                self.close_journal(journal, remove=remove_journal)
+
         else:
             raise ValueError("Device in CERTIFIED mode")
 
         resp["request"] = requests
         resp["response"] = results
+        resp["timing"] = timing
         return resp
 
+    @staticmethod
+    def _is_cli_error(exc):
+        """
+        Tells whether a command failed because the device rejected it, as
+        opposed to a failure of the SSH session
+        :return: True when the error is an ERROR: line of the device
+        """
+        return CLI_ERROR_RE.search(to_text(exc)) is not None
+
+    def _vlan_members(self):
+        """
+        Collects the VLAN memberships of the device
+        :return: the MemberRecord of each membership, by VLAN ID
+        """
+        vlan_members = {}
+        output = self.send_command(command="show vlan members")
+        for member in parse_output("show vlan members", output) or []:
+            record = to_member_record(member)
+            vlan_members.setdefault(record.vlan_id, []).append(record)
+        return vlan_members
+
+    @staticmethod
+    def _already_applied(cmd, exc):
+        """
+        Tells whether the error of the device on a command sent again shows
+        it was already applied, any other error is raised as usual
+        :return: True when the command was already applied
+        """
+        error = to_text(exc)
+        if cmd.startswith("no "):
+            return ALREADY_REMOVED_RE.search(error) is not None
+        return ALREADY_EXISTS_RE.search(error) is not None
+
+    def _journal_path(self):
+        journal_dir = self.get_option("journal_dir")
+        if not journal_dir:
+            return None
+        return os.path.join(
+            os.path.expanduser(journal_dir),
+            "%s.journal" % self._connection.get_option("host"),
+        )
+
+    def open_journal(self, lines, commit, append=False, key=None):
+        """
+        Opens the journal of the configuration pushed to the host. The first line
+        holds the candidate, its hash, the commit flag and the key of the run, that
+        is the module and the hash of its desired state, then the index of each
+        acknowledged command is appended on its own line.
+        :return: the journal file object, or None when the journal is disabled
+        """
+        path = self._journal_path()
+        if not path:
+            return None
+        if append:
+            return open(path, "a")
+
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        data = json.dumps(lines, sort_keys=True)
+        journal = open(path, "w")
+        journal.write(
+            json.dumps(
+                {
+                    "hash": hashlib.sha256(data.encode("utf-8")).hexdigest(),
+                    "commit": commit,
+                    "candidate": lines,
+                    "key": key,
+                },
+            )
+            + "\n",
+        )
+        journal.flush()
+        return journal
+
+    def close_journal(self, journal, remove=False):
+        if journal is None:
+            return
+        journal.close()
+        if remove:
+            os.remove(journal.name)
+
+    def load_journal(self, key=None):
+        """
+        Loads the journal of an interrupted configuration push to the host
+        :param key: the key of the run, the journal of another run is ignored
+        :return: the journal with the index of the next command to send, or None
+        """
+        path = self._journal_path()
+        if not path or not os.path.exists(path):
+            return None
+
+        with open(path) as journal:
+            try:
+                header = json.loads(journal.readline())
+                index = 0
+                for line in journal:
+                    # a line cut by an interruption is not acknowledged
+                    if line.endswith("\n"):
+                        index = int(line)
+            except ValueError:
+                return None
+
+        data = json.dumps(header.get("candidate"), sort_keys=True)
+        if hashlib.sha256(data.encode("utf-8")).hexdigest() != header.get("hash"):
+            return None
+        if header.get("key") != key:
+            return None
+        header["index"] = index
+        return header
+
     # def edit_macro(self, candidate=None, commit=True, replace=None, comment=None):
     #     """
     #     ios_config:
@@ -272,6 +506,42 @@ class Cliconf(CliconfBase):
     #     resp["response"] = results
     #     return resp
 
+    def rollback_config(self, rollback):
+        """
+        Sends, in reverse order, the inverse commands of the lines already applied
+        :param rollback: the list of inverse commands of each applied line
+        :return: the errors raised by the device while rolling back
+        """
+        errors = []
+        for undo in reversed(rollback):
+            for cmd in undo:
+                try:
+                    self.send_command(command=cmd)
+                except AnsibleConnectionFailure as exc:
+                    errors.append("%s: %s" % (cmd, to_text(exc)))
+        return errors
+
+    def rollback(self, rollback_id, commit=True):
+        """
+        Reverts the last configuration applied with edit_config on this connection,
+        only the rollback_id 0 (most recent change) is supported.
+        """
+        if rollback_id != 0:
+            raise ValueError("only rollback_id 0 (the most recent change) is supported")
+
+        resp = {}
+        requests = [cmd for undo in reversed(self._last_rollback) for cmd in undo]
+        if requests:
+            errors = self.rollback_config(self._last_rollback)
+            if errors:
+                raise ValueError("Rollback failed: %s" % "; ".join(errors))
+            self._last_rollback = []
+            if commit and self.get_option("write_memory_flag"):
+                self.write_memory()
+            resp["diff"] = "\n".join(requests)
+        resp["request"] = requests
+        return resp
+
     def get(
         self,
         command=None,
@@ -341,21 +611,21 @@ class Cliconf(CliconfBase):
             device_info["network_os"] = "aos8"
             reply = self.get(command="show system")
             data = to_text(reply, errors="surrogate_or_strict").strip()
-            match = re.search(r"Alcatel-Lucent Enterprise\s([\w\s]+\-[\w]+)\s([0-9.RAG\s]+)\,", data)
-            if match:
-                device_info["network_os_model"] = match.group(1)
-                device_info["network_os_version"] = match.group(2)
-            match = re.search(r"Up Time:\s+(.*)\,", data, re.M)
-            if match:
-                device_info["network_os_uptime"] = match.group(1)
+            device_info.update(parse_show_system(data))
             self._device_info = device_info
         return self._device_info
 
+    def _reset_device_info(self, commands):
+        # The device info is cached for the life of the connection, it is
+        # read again after a change of the system name it holds
+        if any(SYSTEM_NAME_RE.match(cmd) for cmd in commands):
+            self._device_info = {}
+
     def get_device_operations(self):
         return {
             "supports_diff_replace": True,
             "supports_commit": False,
-            "supports_rollback": False,
+            "supports_rollback": True,
             "supports_defaults": True,
             "supports_onbox_diff": False,
             "supports_commit_comment": False,
@@ -386,10 +656,11 @@ class Cliconf(CliconfBase):
             raise ValueError("'commands' value is required")
 
         responses = list()
-        for cmd in to_list(commands):
-            if not isinstance(cmd, Mapping):
-                cmd = {"command": cmd}
-
+        commands = [
+            cmd if isinstance(cmd, Mapping) else {"command": cmd} for cmd in to_list(commands)
+        ]
+        self._reset_device_info(cmd["command"] for cmd in commands)
+        for cmd in commands:
             output = cmd.pop("output", None)
             if output:
                 raise ValueError("'output' value %s is not supported for run_commands" % output)
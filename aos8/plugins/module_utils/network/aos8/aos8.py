@@ -35,6 +35,8 @@ from ansible.module_utils._text import to_text
 from ansible.module_utils.connection import Connection, ConnectionError
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import to_list
 
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import parse_port
+
 
 _DEVICE_CONFIGS = {}
 
@@ -117,11 +119,31 @@ def load_config(module, commands):
         module.fail_json(msg=to_text(exc))
 
 
+def load_snapshot(module, path):
+    """Read a stored snapshot of the device, the captured output of the
+    show commands parsed by the facts, in place of a device connection.
+
+    :rtype: A string
+    :returns: the content of the snapshot
+    """
+    try:
+        with open(path, "rb") as snapshot:
+            return to_text(snapshot.read(), errors="surrogate_then_replace")
+    except (IOError, OSError) as exc:
+        module.fail_json(
+            msg="unable to read offline_source {0}: {1}".format(path, to_text(exc)),
+        )
+
+
 def normalize_interface(name):
     """Return the normalized interface name"""
     if not name:
         return
 
+    port = parse_port(name)
+    if port is not None:
+        return port.name
+
     def _get_number(name):
         digits = ""
         for char in name:
@@ -20,4 +20,11 @@ class CommandArgs(object):  # pylint: disable=R0903
     argument_spec = {
         "commands": {"required": True, "type": "list", "elements": "raw"},
         "output": {"aliases": ["output"], "type": "list", "elements": "str"},
+        "wait_for": {"aliases": ["waitfor"], "type": "list", "elements": "str"},
+        "match": {"default": "all", "choices": ["all", "any"], "type": "str"},
+        "retries": {"default": 9, "type": "int"},
+        "interval": {"default": 1, "type": "int"},
+        "backoff": {"default": 2.0, "type": "float"},
+        "output_lines": {"default": True, "type": "bool"},
+        "dest": {"type": "path"},
     }  # pylint: disable=C0301
@@ -18,6 +18,7 @@ class HostnameArgs(object):  # pylint: disable=R0903
 
     argument_spec = {
         "config": {"type": "dict", "options": {"hostname": {"type": "str"}}},
+        "running_config": {"type": "str"},
         "state": {
             "type": "str",
             "choices": [
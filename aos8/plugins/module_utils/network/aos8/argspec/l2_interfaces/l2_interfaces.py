@@ -40,6 +40,8 @@ class L2_interfacesArgs(object):  # pylint: disable=R0903
             },
         },
         "running_config": {"type": "str"},
+        "offline_source": {"type": "path"},
+        "resume": {"type": "bool", "default": False},
         "state": {
             "choices": [
                 "merged",
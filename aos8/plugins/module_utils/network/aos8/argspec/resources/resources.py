@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+"""
+The arg spec for the aos8_resources module
+"""
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.argspec.l2_interfaces.l2_interfaces import (
+    L2_interfacesArgs,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.argspec.vlans.vlans import (
+    VlansArgs,
+)
+
+
+class ResourcesArgs(object):  # pylint: disable=R0903
+    """The arg spec for the aos8_resources module"""
+
+    argument_spec = {
+        "vlans": {
+            "type": "list",
+            "elements": "dict",
+            "options": VlansArgs.argument_spec["config"]["options"],
+        },
+        "l2_interfaces": {
+            "type": "list",
+            "elements": "dict",
+            "options": L2_interfacesArgs.argument_spec["config"]["options"],
+        },
+        "resume": {"type": "bool", "default": False},
+        "state": {
+            "choices": [
+                "merged",
+                "replaced",
+                "overridden",
+                "deleted",
+                "rendered",
+                "gathered",
+            ],
+            "default": "merged",
+            "type": "str",
+        },
+    }  # pylint: disable=C0301
@@ -27,12 +27,14 @@ class VlansArgs(object):
             "options": {
                 "name": {"type": "str"},
                 "vlan_id": {"required": True, "type": "int"},
-                "mtu": {"type": "int", "default" : 1500},
-                "admin": {"type": "str", "choices": ["enable", "disable"], "default": "enable"},
+                "mtu": {"type": "int"},
+                "admin": {"type": "str", "choices": ["enable", "disable"]},
                 "operational_state": {"type": "str", "choices": ["enable", "disable"]},
             },
         },
         "running_config": {"type": "str"},
+        "offline_source": {"type": "path"},
+        "resume": {"type": "bool", "default": False},
         "state": {
             "choices": [
                 "merged",
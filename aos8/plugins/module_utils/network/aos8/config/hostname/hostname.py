@@ -32,6 +32,9 @@ from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.facts.fa
 from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.rm_templates.hostname import (
     HostnameTemplate,
 )
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import (
+    PhaseTimer,
+)
 
 
 class Hostname(ResourceModule):
@@ -40,13 +43,16 @@ class Hostname(ResourceModule):
     """
 
     def __init__(self, module):
-        super(Hostname, self).__init__(
-            empty_fact_val={},
-            facts_module=Facts(module),
-            module=module,
-            resource="hostname",
-            tmplt=HostnameTemplate(),
-        )
+        self.timer = PhaseTimer()
+        # the facts are gathered by the base class
+        with self.timer.phase("facts"):
+            super(Hostname, self).__init__(
+                empty_fact_val={},
+                facts_module=Facts(module),
+                module=module,
+                resource="hostname",
+                tmplt=HostnameTemplate(),
+            )
         self.parsers = ["hostname"]
 
     def execute_module(self):
@@ -56,9 +62,21 @@ class Hostname(ResourceModule):
         :returns: The result from module execution
         """
         if self.state not in ["parsed", "gathered"]:
-            self.generate_commands()
+            with self.timer.phase("diff"):
+                self.generate_commands()
             self.run_commands()
-        return self.result
+        with self.timer.phase("facts"):
+            result = self.result
+        result["timing"] = self.timer.to_dict()
+        return result
+
+    def run_commands(self):
+        """ Send the commands to the device, timing the push
+        """
+        if self.commands and self.state in self.ACTION_STATES:
+            if not self._module.check_mode:
+                self.timer.edit_config(self._connection, self.commands)
+            self.changed = True
 
     def generate_commands(self):
         """ Generate configuration commands to send based on
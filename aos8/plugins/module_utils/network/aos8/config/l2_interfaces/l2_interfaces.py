@@ -13,8 +13,6 @@ created
 
 from __future__ import absolute_import, division, print_function
 
-import re
-
 __metaclass__ = type
 
 
@@ -26,8 +24,20 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.u
     to_list,
 )
 
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.aos8 import load_snapshot
 from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.facts.facts import Facts
-from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import dict_to_set
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.facts.l2_interfaces.l2_interfaces import (
+    L2_interfacesFacts,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import (
+    MembershipMatrix,
+    PhaseTimer,
+    compress_port_commands,
+    compress_vlan_commands,
+    journal_key,
+    rollback_candidate,
+    to_member_record,
+)
 
 
 class L2_interfaces(ConfigBase):
@@ -38,18 +48,33 @@ class L2_interfaces(ConfigBase):
     gather_network_resources = ["l2_interfaces"]
 
     def __init__(self, module):
-        super(L2_interfaces, self).__init__(module)
+        if module.params.get("offline_source"):
+            # The facts are read from a snapshot on the controller, so no
+            # connection to the device is opened
+            self._module = module
+            self.state = module.params["state"]
+            self._connection = None
+        else:
+            super(L2_interfaces, self).__init__(module)
 
     def get_l2_interfaces_facts(self, data=None):
         """Get the 'facts' (the current configuration)
         :rtype: A dictionary
         :returns: The current configuration as a dictionary
         """
-        facts, _warnings = Facts(self._module).get_facts(
-            self.gather_subset,
-            self.gather_network_resources,
-            data=data,
-        )
+        offline_source = self._module.params.get("offline_source")
+        if offline_source and data is None:
+            facts = L2_interfacesFacts(self._module).populate_facts(
+                None,
+                {"ansible_network_resources": {}},
+                data=load_snapshot(self._module, offline_source),
+            )
+        else:
+            facts, _warnings = Facts(self._module).get_facts(
+                self.gather_subset,
+                self.gather_network_resources,
+                data=data,
+            )
         l2_interfaces_facts = facts["ansible_network_resources"].get("l2_interfaces")
         if not l2_interfaces_facts:
             return []
@@ -63,28 +88,70 @@ class L2_interfaces(ConfigBase):
         result = {"changed": False}
         commands = list()
         warnings = list()
-        self.have_now = list()
+        timer = PhaseTimer()
+        key = journal_key("aos8_l2_interfaces", self._module.params, "config")
+
+        if (
+            self._module.params.get("offline_source")
+            and self.state in self.ACTION_STATES
+            and not self._module.check_mode
+        ):
+            self._module.fail_json(
+                msg="offline_source can only be used in check mode with state {0}".format(
+                    self.state,
+                ),
+            )
+
+        if (
+            self.state in self.ACTION_STATES
+            and self._module.params.get("resume")
+            and not self._module.check_mode
+        ):
+            # continue the push interrupted on a previous run, if any, without
+            # collecting the facts and computing the diff again
+            resp = timer.edit_config(self._connection, resume=True, journal_key=key)
+            if resp.get("resumed"):
+                result["changed"] = True
+                result["commands"] = resp["request"]
+                with timer.phase("facts"):
+                    result["after"] = self.get_l2_interfaces_facts()
+                result["warnings"] = warnings
+                result["timing"] = timer.to_dict()
+                return result
 
         # if state in ACTION_STATES, get interface facts from device
-        if self.state in self.ACTION_STATES:
-            existing_l2_interfaces_facts = self.get_l2_interfaces_facts()
+        if self.state in self.ACTION_STATES or (
+            self.state == "rendered" and self._module.params.get("offline_source")
+        ):
+            # rendered is a preview of the changes against the snapshot
+            with timer.phase("facts"):
+                existing_l2_interfaces_facts = self.get_l2_interfaces_facts()
         else:
             existing_l2_interfaces_facts = []
 
         # if state in ACTION_STATES, generate commands to device or rendered commands
         if self.state in self.ACTION_STATES or self.state == "rendered":
-            commands.extend(self.set_config(existing_l2_interfaces_facts))
+            with timer.phase("diff"):
+                commands.extend(self.set_config(existing_l2_interfaces_facts))
 
         # if state in ACTION_STATES, commands generated and check_mode false, send command to device            
         if commands and self.state in self.ACTION_STATES:
             if not self._module.check_mode:              
-                self._connection.edit_config(commands)
+                timer.edit_config(
+                    self._connection,
+                    rollback_candidate(
+                        commands,
+                        members=[to_member_record(each) for each in existing_l2_interfaces_facts],
+                    ),
+                    journal_key=key,
+                )
             result["changed"] = True
         if self.state in self.ACTION_STATES:
             result["commands"] = commands
 
         if self.state in self.ACTION_STATES or self.state == "gathered":
-            changed_l2_interfaces_facts = self.get_l2_interfaces_facts()
+            with timer.phase("facts"):
+                changed_l2_interfaces_facts = self.get_l2_interfaces_facts()
         elif self.state == "rendered":
             result["rendered"] = commands
         elif self.state == "parsed":
@@ -105,6 +172,7 @@ class L2_interfaces(ConfigBase):
             result["gathered"] = changed_l2_interfaces_facts
 
         result["warnings"] = warnings
+        result["timing"] = timer.to_dict()
         return result
 
     def set_config(self, existing_l2_interfaces_facts):
@@ -118,16 +186,16 @@ class L2_interfaces(ConfigBase):
         want = []
         if self._module.params.get("config"):
             for cfg in self._module.params["config"]:
-                want.append(remove_empties(cfg))
-        have = existing_l2_interfaces_facts
+                want.append(to_member_record(remove_empties(cfg)))
+        have = [to_member_record(each) for each in existing_l2_interfaces_facts]
         resp = self.set_state(want, have)
         return to_list(resp)
 
     def set_state(self, want, have):
         """Select the appropriate function based on the state provided
 
-        :param want: the desired configuration as a dictionary
-        :param have: the current configuration as a dictionary
+        :param want: the desired configuration as a list of MemberRecord
+        :param have: the current configuration as a list of MemberRecord
         :rtype: A list
         :returns: the commands necessary to migrate the current configuration
                   to the desired configuration
@@ -158,21 +226,14 @@ class L2_interfaces(ConfigBase):
         :returns: the commands necessary to migrate the current configuration
                   to the desired configuration
         """
-        commands = []
+        want_matrix = self._matrix(want)
+        have_matrix = self._matrix(have)
 
-        check = False
-        for each in want:
-            for every in have:
-                if every == each :
-                    check = True
-                    break
-                continue
-            if check:
-                commands.extend(self._set_config(each, every))
-            else:
-                commands.extend(self._set_config(each, dict()))
+        # Only the memberships of the ports given in the desired state are
+        # replaced, the other ports are left as they are
+        to_add, to_remove = self._replace_ports(want_matrix.ports, want_matrix, have_matrix)
 
-        return commands
+        return self._membership_commands(to_add, to_remove, want_matrix.untagged_by_port())
 
     def _state_overridden(self, want, have):
         """The command generator when state is overridden
@@ -181,33 +242,16 @@ class L2_interfaces(ConfigBase):
         :returns: the commands necessary to migrate the current configuration
                   to the desired configuration
         """
-        commands = []
+        want_matrix = self._matrix(want)
+        have_matrix = self._matrix(have)
 
-        want_local = want
-        self.have_now = have.copy()
-        for each in have:
-            count = 0
-            for every in want_local:
-                if each == every:
-                    break
-                count += 1
-            else:
-                # We didn't find a matching desired state, which means we can
-                # pretend we received an empty desired state.
-                commands.extend(self._clear_config(every, each))
-                continue
-            commands.extend(self._set_config(every, each))
-            # as the pre-existing L2 Interface are now configured by
-            # above set_config call, deleting the respective
-            # L2 Interface entry from the want_local list
-            del want_local[count]
-
-        # Iterating through want_local list which now only have new L2 Interfaces to be
-        # configured
-        for each in want_local:
-            commands.extend(self._set_config(each, dict()))
+        # The ports without a desired state are replaced as if we received
+        # an empty desired state for them
+        ports = list(want_matrix.ports)
+        ports.extend(port for port in have_matrix.ports if port not in want_matrix)
+        to_add, to_remove = self._replace_ports(ports, want_matrix, have_matrix)
 
-        return commands
+        return self._membership_commands(to_add, to_remove, want_matrix.untagged_by_port())
 
     def _state_merged(self, want, have):
         """The command generator when state is merged
@@ -216,21 +260,26 @@ class L2_interfaces(ConfigBase):
         :returns: the commands necessary to merge the provided into
                   the current configuration
         """
-        commands = []
-
-        check = False             
-        for each in want:
-            for every in have:
-                if each == every:
-                    check = True
-                    break
-                continue
-            if check:
-                commands.extend(self._set_config(each, every))
-            else:
-                commands.extend(self._set_config(each, dict()))
-
-        return commands
+        want_matrix = self._matrix(want)
+        have_matrix = self._matrix(have)
+        to_add = []
+        to_remove = []
+        for port in want_matrix.ports:
+            want_tagged, want_untagged = want_matrix.get(port)
+            have_tagged = have_matrix.get(port)[0]
+            have_untagged = have_matrix.default_vlan(port)
+            tagged = want_tagged & ~have_tagged
+            if want_untagged == have_untagged:
+                want_untagged = None
+            to_add.extend(want_matrix.records(port, tagged, want_untagged))
+
+            # A membership which is desired with another mode has to be removed
+            if have_untagged != have_matrix.DEFAULT_VLAN and tagged >> have_untagged & 1:
+                to_remove.extend(have_matrix.records(port, 0, have_untagged))
+            if want_untagged is not None and have_tagged >> want_untagged & 1:
+                to_remove.extend(have_matrix.records(port, 1 << want_untagged))
+
+        return self._membership_commands(to_add, to_remove, want_matrix.untagged_by_port())
 
     def _state_deleted(self, want, have):
         """The command generator when state is deleted
@@ -239,25 +288,106 @@ class L2_interfaces(ConfigBase):
         :returns: the commands necessary to remove the current configuration
                   of the provided objects
         """
-        commands = []
-
         if want:
-            check = False
-            for each in want:
-                for every in have:
-                    if each == every:
-                        check = True
-                        break
-                    check = False
-                    continue
-                if check:
-                    commands.extend(self._clear_config(each, every))
+            to_remove = set(want) & set(have)
+            to_remove = [each for each in want if each in to_remove]
         else:
-            for each in have:
-                commands.extend(self._clear_config(dict(), each))
+            to_remove = have
+
+        return self._membership_commands([], to_remove, dict())
+
+    @staticmethod
+    def _replace_ports(ports, want_matrix, have_matrix):
+        """Compare the memberships of the given ports, so that each of them
+           ends up with exactly its desired memberships. A port without a
+           desired untagged VLAN goes back to the default VLAN, which is
+           never added nor removed as the port falls back to it.
+
+        :rtype: A tuple
+        :returns: the MemberRecord to add and the MemberRecord to remove
+        """
+        to_add = []
+        to_remove = []
+        for port in ports:
+            want_tagged = want_matrix.get(port)[0]
+            have_tagged = have_matrix.get(port)[0]
+            want_untagged = want_matrix.default_vlan(port)
+            have_untagged = have_matrix.default_vlan(port)
+            changed = want_tagged ^ have_tagged
+            if want_untagged != have_untagged:
+                if want_untagged != want_matrix.DEFAULT_VLAN:
+                    to_add.extend(want_matrix.records(port, 0, want_untagged))
+                if have_untagged != have_matrix.DEFAULT_VLAN:
+                    to_remove.extend(have_matrix.records(port, 0, have_untagged))
+            to_add.extend(want_matrix.records(port, changed & want_tagged))
+            to_remove.extend(have_matrix.records(port, changed & have_tagged))
+        return to_add, to_remove
+
+    def _membership_commands(self, to_add, to_remove, want_untagged):
+        """Generate the ordered commands for a membership change, knowing
+           that a port always has exactly one untagged (default) VLAN.
+
+           Adding a port untagged to a VLAN moves its default VLAN, so the
+           removal of the previous untagged membership is not needed. All
+           the other removals are done after the additions so the port does
+           not fall back to VLAN 1 in between, except for the memberships
+           which are re-added with another mode and have to go first. The
+           untagged memberships of VLAN 1 are never removed, a port leaves
+           its default VLAN only by being untagged in another one.
+
+        :param to_add: the MemberRecord to add
+        :param to_remove: the MemberRecord to remove
+        :param want_untagged: the desired untagged vlan_id keyed by port_number
+        :rtype: A list
+        :returns: the compressed commands, in the order they have to be applied
+        """
+        readded = set((each.port_number, each.vlan_id) for each in to_add)
+        pre_remove = []
+        post_remove = []
+        for each in to_remove:
+            if each.mode == "untagged":
+                untagged = want_untagged.get(each.port_number, MembershipMatrix.DEFAULT_VLAN)
+                if each.vlan_id == MembershipMatrix.DEFAULT_VLAN or untagged not in (
+                    MembershipMatrix.DEFAULT_VLAN,
+                    each.vlan_id,
+                ):
+                    continue
+            if (each.port_number, each.vlan_id) in readded:
+                pre_remove.append(each)
+            else:
+                post_remove.append(each)
 
+        phases = [
+            [self._clear_config(None, each) for each in pre_remove],
+            [self._set_config(each, None) for each in to_add if each.mode == "untagged"],
+            [self._set_config(each, None) for each in to_add if each.mode != "untagged"],
+            [self._clear_config(None, each) for each in post_remove],
+        ]
+
+        # Each phase is compressed on its own to keep the ordering
+        commands = []
+        for phase in phases:
+            commands.extend(
+                compress_vlan_commands(compress_port_commands([cmd for cmds in phase for cmd in cmds])),
+            )
         return commands
 
+    def _matrix(self, config):
+        """Build the membership matrix of a list of MemberRecord so that
+           want/have are compared port by port, failing if a port is given
+           more than one untagged VLAN.
+
+        :param config: the list of MemberRecord
+        :rtype: A MembershipMatrix
+        :returns: the memberships of the ports
+        """
+        matrix = MembershipMatrix()
+        for each in config:
+            try:
+                matrix.add(each.vlan_id, each.port_number, each.mode)
+            except ValueError as exc:
+                self._module.fail_json(msg=str(exc))
+        return matrix
 
     def _set_config(self, want, have):
         # Set the L2 Interface config based on the want and have config
@@ -265,46 +395,19 @@ class L2_interfaces(ConfigBase):
         # vlan 10 members port 1/1/1 untagged
 
         commands = []
-        port_number = dict(want).get("port_number")
 
-        # Get the diff b/w want n have
-        want_dict = dict_to_set(want, sort_dictionary=True)
-        have_dict = dict_to_set(have, sort_dictionary=True)
-        diff = want_dict - have_dict
-
-        if diff:
-            port_type = dict(want).get("port_type")
-            vlan_id = dict(want).get("vlan_id")
-            mode = dict(want).get("mode")
-
-            if port_type:
-                if re.match('(\d)+\/(\d)+\/(\d)+', port_number):
-                    port_type_attr = 'port'
-                else:
-                    port_type_attr = 'linkagg'
-            commands.append("vlan " + str(vlan_id) + " members " + port_type_attr + " " + port_number + " " + mode)
+        if want != have:
+            commands.append(
+                "vlan " + str(want.vlan_id) + " members " + want.port_type + " " + want.port_number + " " + want.mode
+            )
 
         return commands
 
     def _clear_config(self, want, have):
-        # Delete the L2 Interface config based on the want and have config
+        # Delete the L2 Interface config based on the want and have config,
+        # want is None when there is no desired state for the membership
         commands = []
-        port_number = dict(have).get("port_number")
-        port_type = dict(have).get("port_type")
-        vlan_id = dict(have).get("vlan_id")
-        mode = dict(have).get("mode")        
-        if port_type:
-            if re.match('(\d)+\/(\d)+\/(\d)+', port_number):
-                port_type_attr = 'port'
-            else:
-                port_type_attr = 'linkagg'        
 
-        if (
-            have.get("port_number")
-            and (have.get("port_number") != want.get("port_number") 
-            or self.state == "deleted")
-        ):
-            commands.append("no vlan " + str(vlan_id) + " members " + port_type_attr + " " + port_number)
-            if self.state == "overridden":
-                self.have_now.remove(have)
+        if want is None or have.port_number != want.port_number or self.state == "deleted":
+            commands.append("no vlan " + str(have.vlan_id) + " members " + have.port_type + " " + have.port_number)
         return commands
@@ -0,0 +1,189 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The aos8_resources class
+It is in this file where the current VLAN and VLAN membership configuration
+(as dict) is compared to the provided configuration (as dict) using the
+aos8_vlans and aos8_l2_interfaces diff logic, and the commands of both
+resources are merged into a single, dependency ordered, command set
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.cfg.base import (
+    ConfigBase,
+)
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
+    remove_empties,
+    to_list,
+)
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.config.l2_interfaces.l2_interfaces import (
+    L2_interfaces,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.config.vlans.vlans import Vlans
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.facts.facts import Facts
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import (
+    PhaseTimer,
+    compress_vlan_commands,
+    journal_key,
+    rollback_candidate,
+    to_member_record,
+    to_vlan_record,
+)
+
+
+class Resources(ConfigBase):
+    """
+    The aos8_resources class
+    """
+    gather_subset = ["!all", "!min"]
+    gather_network_resources = ["vlans", "l2_interfaces"]
+
+    def __init__(self, module):
+        super(Resources, self).__init__(module)
+        self._vlans = Vlans(module)
+        self._l2_interfaces = L2_interfaces(module)
+
+    def get_resources_facts(self, data=None):
+        """Get the 'facts' (the current configuration) of all the resources
+        with a single facts collection
+        :rtype: A dictionary
+        :returns: The current configuration keyed by resource
+        """
+        facts, _warnings = Facts(self._module).get_facts(
+            self.gather_subset,
+            self.gather_network_resources,
+            data=data,
+        )
+        resources = facts["ansible_network_resources"]
+        return dict(
+            (resource, resources.get(resource) or [])
+            for resource in self.gather_network_resources
+        )
+
+    def execute_module(self):
+        """Execute the module
+        :rtype: A dictionary
+        :returns: The result from module execution
+        """
+        result = {"changed": False}
+        commands = list()
+        warnings = list()
+        timer = PhaseTimer()
+        key = journal_key("aos8_resources", self._module.params, "vlans", "l2_interfaces")
+
+        if (
+            self.state in self.ACTION_STATES
+            and self._module.params.get("resume")
+            and not self._module.check_mode
+        ):
+            # continue the push interrupted on a previous run, if any, without
+            # collecting the facts and computing the diff again
+            resp = timer.edit_config(self._connection, resume=True, journal_key=key)
+            if resp.get("resumed"):
+                result["changed"] = True
+                result["commands"] = resp["request"]
+                with timer.phase("facts"):
+                    result["after"] = self.get_resources_facts()
+                result["warnings"] = warnings
+                result["timing"] = timer.to_dict()
+                return result
+
+        if self.state in self.ACTION_STATES:
+            with timer.phase("facts"):
+                existing_resources_facts = self.get_resources_facts()
+        else:
+            existing_resources_facts = dict(
+                (resource, []) for resource in self.gather_network_resources
+            )
+
+        if self.state in self.ACTION_STATES or self.state == "rendered":
+            with timer.phase("diff"):
+                commands.extend(self.set_config(existing_resources_facts))
+        if commands and self.state in self.ACTION_STATES:
+            if not self._module.check_mode:
+                timer.edit_config(
+                    self._connection,
+                    rollback_candidate(
+                        commands,
+                        vlans=[to_vlan_record(each) for each in existing_resources_facts["vlans"]],
+                        members=[
+                            to_member_record(each)
+                            for each in existing_resources_facts["l2_interfaces"]
+                        ],
+                    ),
+                    journal_key=key,
+                )
+            result["changed"] = True
+        if self.state in self.ACTION_STATES:
+            result["commands"] = commands
+
+        if self.state in self.ACTION_STATES or self.state == "gathered":
+            with timer.phase("facts"):
+                changed_resources_facts = self.get_resources_facts()
+        elif self.state == "rendered":
+            result["rendered"] = commands
+        else:
+            changed_resources_facts = {}
+
+        if self.state in self.ACTION_STATES:
+            result["before"] = existing_resources_facts
+            if result["changed"]:
+                result["after"] = changed_resources_facts
+        elif self.state == "gathered":
+            result["gathered"] = changed_resources_facts
+
+        result["warnings"] = warnings
+        result["timing"] = timer.to_dict()
+        return result
+
+    def set_config(self, existing_resources_facts):
+        """Collect the configuration of every resource from the args passed
+            to the module, collect the current configuration (as a dict from facts)
+            and diff them with the resource own logic. A resource which is not
+            provided is left untouched.
+
+        :rtype: A list
+        :returns: the commands necessary to migrate the current configuration
+                  to the desired configuration
+        """
+        vlan_commands = []
+        if self._module.params.get("vlans") is not None:
+            want = [to_vlan_record(remove_empties(cfg)) for cfg in self._module.params["vlans"]]
+            have = [to_vlan_record(each) for each in existing_resources_facts["vlans"]]
+            vlan_commands = compress_vlan_commands(to_list(self._vlans.set_state(want, have)))
+
+        member_commands = []
+        if self._module.params.get("l2_interfaces") is not None:
+            want = [
+                to_member_record(remove_empties(cfg)) for cfg in self._module.params["l2_interfaces"]
+            ]
+            have = [to_member_record(each) for each in existing_resources_facts["l2_interfaces"]]
+            member_commands = to_list(self._l2_interfaces.set_state(want, have))
+
+        return self.plan_commands(vlan_commands, member_commands)
+
+    @staticmethod
+    def plan_commands(vlan_commands, member_commands):
+        """Merge the VLAN and VLAN membership commands in dependency order:
+           the VLANs are created and configured first, then the memberships
+           are changed, and the VLANs are deleted last once their members
+           have been moved away.
+
+        :param vlan_commands: the commands generated by aos8_vlans
+        :param member_commands: the ordered commands generated by aos8_l2_interfaces
+        :rtype: A list
+        :returns: the commands in the order they have to be applied
+        """
+        commands = [cmd for cmd in vlan_commands if not cmd.startswith("no ")]
+        commands.extend(member_commands)
+        commands.extend(cmd for cmd in vlan_commands if cmd.startswith("no "))
+        return commands
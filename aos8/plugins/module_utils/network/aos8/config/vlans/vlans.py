@@ -25,8 +25,21 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.u
     to_list,
 )
 
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.aos8 import load_snapshot
 from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.facts.facts import Facts
-from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import dict_to_set
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.facts.vlans.vlans import (
+    VlansFacts,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import (
+    PhaseTimer,
+    VlanRecord,
+    VlanSet,
+    compress_vlan_commands,
+    diff_records,
+    journal_key,
+    rollback_candidate,
+    to_vlan_record,
+)
 
 
 class Vlans(ConfigBase):
@@ -37,18 +50,33 @@ class Vlans(ConfigBase):
     gather_network_resources = ["vlans"]
 
     def __init__(self, module):
-        super(Vlans, self).__init__(module)
+        if module.params.get("offline_source"):
+            # The facts are read from a snapshot on the controller, so no
+            # connection to the device is opened
+            self._module = module
+            self.state = module.params["state"]
+            self._connection = None
+        else:
+            super(Vlans, self).__init__(module)
 
     def get_vlans_facts(self, data=None):
         """Get the 'facts' (the current configuration)
         :rtype: A dictionary
         :returns: The current configuration as a dictionary
         """
-        facts, _warnings = Facts(self._module).get_facts(
-            self.gather_subset,
-            self.gather_network_resources,
-            data=data,
-        )
+        offline_source = self._module.params.get("offline_source")
+        if offline_source and data is None:
+            facts = VlansFacts(self._module).populate_facts(
+                None,
+                {"ansible_network_resources": {}},
+                data=load_snapshot(self._module, offline_source),
+            )
+        else:
+            facts, _warnings = Facts(self._module).get_facts(
+                self.gather_subset,
+                self.gather_network_resources,
+                data=data,
+            )
         vlans_facts = facts["ansible_network_resources"].get("vlans")
         if not vlans_facts:
             return []
@@ -62,23 +90,66 @@ class Vlans(ConfigBase):
         result = {"changed": False}
         commands = list()
         warnings = list()
-        self.have_now = list()
-        if self.state in self.ACTION_STATES:
-            existing_vlans_facts = self.get_vlans_facts()
+        timer = PhaseTimer()
+        key = journal_key("aos8_vlans", self._module.params, "config")
+
+        if (
+            self._module.params.get("offline_source")
+            and self.state in self.ACTION_STATES
+            and not self._module.check_mode
+        ):
+            self._module.fail_json(
+                msg="offline_source can only be used in check mode with state {0}".format(
+                    self.state,
+                ),
+            )
+
+        if (
+            self.state in self.ACTION_STATES
+            and self._module.params.get("resume")
+            and not self._module.check_mode
+        ):
+            # continue the push interrupted on a previous run, if any, without
+            # collecting the facts and computing the diff again
+            resp = timer.edit_config(self._connection, resume=True, journal_key=key)
+            if resp.get("resumed"):
+                result["changed"] = True
+                result["commands"] = resp["request"]
+                with timer.phase("facts"):
+                    result["after"] = self.get_vlans_facts()
+                result["warnings"] = warnings
+                result["timing"] = timer.to_dict()
+                return result
+
+        if self.state in self.ACTION_STATES or (
+            self.state == "rendered" and self._module.params.get("offline_source")
+        ):
+            # rendered is a preview of the changes against the snapshot
+            with timer.phase("facts"):
+                existing_vlans_facts = self.get_vlans_facts()
         else:
             existing_vlans_facts = []
 
         if self.state in self.ACTION_STATES or self.state == "rendered":
-            commands.extend(self.set_config(existing_vlans_facts))
+            with timer.phase("diff"):
+                commands.extend(self.set_config(existing_vlans_facts))
         if commands and self.state in self.ACTION_STATES:
-            if not self._module.check_mode:              
-                self._connection.edit_config(commands)
+            if not self._module.check_mode:
+                timer.edit_config(
+                    self._connection,
+                    rollback_candidate(
+                        commands,
+                        vlans=[to_vlan_record(each) for each in existing_vlans_facts],
+                    ),
+                    journal_key=key,
+                )
             result["changed"] = True
         if self.state in self.ACTION_STATES:
             result["commands"] = commands
 
         if self.state in self.ACTION_STATES or self.state == "gathered":
-            changed_vlans_facts = self.get_vlans_facts()
+            with timer.phase("facts"):
+                changed_vlans_facts = self.get_vlans_facts()
         elif self.state == "rendered":
             result["rendered"] = commands
         elif self.state == "parsed":
@@ -99,6 +170,7 @@ class Vlans(ConfigBase):
             result["gathered"] = changed_vlans_facts
 
         result["warnings"] = warnings
+        result["timing"] = timer.to_dict()
         return result
 
     def set_config(self, existing_vlans_facts):
@@ -112,16 +184,16 @@ class Vlans(ConfigBase):
         want = []
         if self._module.params.get("config"):
             for cfg in self._module.params["config"]:
-                want.append(remove_empties(cfg))
-        have = existing_vlans_facts
+                want.append(to_vlan_record(remove_empties(cfg)))
+        have = [to_vlan_record(each) for each in existing_vlans_facts]
         resp = self.set_state(want, have)
-        return to_list(resp)
+        return compress_vlan_commands(to_list(resp))
 
     def set_state(self, want, have):
         """Select the appropriate function based on the state provided
 
-        :param want: the desired configuration as a dictionary
-        :param have: the current configuration as a dictionary
+        :param want: the desired configuration as a list of VlanRecord
+        :param have: the current configuration as a list of VlanRecord
         :rtype: A list
         :returns: the commands necessary to migrate the current configuration
                   to the desired configuration
@@ -153,17 +225,9 @@ class Vlans(ConfigBase):
         """
         commands = []
 
-        check = False
+        have_dict = self._index_by_vlan_id(have)
         for each in want:
-            for every in have:
-                if every["vlan_id"] == each["vlan_id"]:
-                    check = True
-                    break
-                continue
-            if check:
-                commands.extend(self._set_config(each, every))
-            else:
-                commands.extend(self._set_config(each, dict()))
+            commands.extend(self._set_config(each, have_dict.get(each.vlan_id)))
 
         return commands
 
@@ -176,29 +240,22 @@ class Vlans(ConfigBase):
         """
         commands = []
 
-        want_local = want
-        self.have_now = have.copy()
-        for each in have:
-            count = 0
-            for every in want_local:
-                if each["vlan_id"] == every["vlan_id"]:
-                    break
-                count += 1
-            else:
-                # We didn't find a matching desired state, which means we can
-                # pretend we received an empty desired state.
-                commands.extend(self._clear_config(every, each))
-                continue
-            commands.extend(self._set_config(every, each))
-            # as the pre-existing VLAN are now configured by
-            # above set_config call, deleting the respective
-            # VLAN entry from the want_local list
-            del want_local[count]
-
-        # Iterating through want_local list which now only have new VLANs to be
-        # configured
-        for each in want_local:
-            commands.extend(self._set_config(each, dict()))
+        want_dict = self._index_by_vlan_id(want)
+        have_dict = self._index_by_vlan_id(have)
+        want_vlans = VlanSet(want_dict)
+        have_vlans = VlanSet(have_dict)
+
+        # The VLANs without a desired state, which means we can pretend
+        # we received an empty desired state for them
+        for vlan_id in have_vlans - want_vlans:
+            commands.extend(self._clear_config(None, have_dict[vlan_id]))
+
+        for vlan_id in have_vlans & want_vlans:
+            commands.extend(self._set_config(want_dict[vlan_id], have_dict[vlan_id]))
+
+        # The VLANs which are not present on the device yet
+        for vlan_id in want_vlans - have_vlans:
+            commands.extend(self._set_config(want_dict[vlan_id], None))
 
         return commands
 
@@ -211,17 +268,9 @@ class Vlans(ConfigBase):
         """
         commands = []
 
-        check = False             
+        have_dict = self._index_by_vlan_id(have)
         for each in want:
-            for every in have:
-                if each.get("vlan_id") == every.get("vlan_id"):
-                    check = True
-                    break
-                continue
-            if check:
-                commands.extend(self._set_config(each, every))
-            else:
-                commands.extend(self._set_config(each, dict()))
+            commands.extend(self._set_config(each, have_dict.get(each.vlan_id)))
 
         return commands
 
@@ -235,22 +284,27 @@ class Vlans(ConfigBase):
         commands = []
 
         if want:
-            check = False
-            for each in want:
-                for every in have:
-                    if each.get("vlan_id") == every.get("vlan_id"):
-                        check = True
-                        break
-                    check = False
-                    continue
-                if check:
-                    commands.extend(self._clear_config(each, every))
+            want_dict = self._index_by_vlan_id(want)
+            have_dict = self._index_by_vlan_id(have)
+            for vlan_id in VlanSet(want_dict) & VlanSet(have_dict):
+                commands.extend(self._clear_config(want_dict[vlan_id], have_dict[vlan_id]))
         else:
             for each in have:
-                commands.extend(self._clear_config(dict(), each))
+                commands.extend(self._clear_config(None, each))
 
         return commands
 
+    @staticmethod
+    def _index_by_vlan_id(config):
+        """Index a list of VlanRecord by vlan_id so that want/have
+           lookups are done in constant time. Later entries win over
+           earlier ones for duplicated vlan_id.
+
+        :rtype: A dictionary
+        :returns: the VlanRecord keyed by vlan_id
+        """
+        return dict((each.vlan_id, each) for each in config)
+
     def remove_command_from_config_list(self, vlan_id, cmd, commands):
         if vlan_id not in commands and cmd != "vlan":
             commands.insert(0, vlan_id)
@@ -267,45 +321,36 @@ class Vlans(ConfigBase):
             commands.append(cmd)
 
     def _set_config(self, want, have):
-        # Set the vlan config based on the want and have config
+        # Set the vlan config based on the want and have config,
+        # have is None when the VLAN does not exist yet
         commands = []
-        vlan = dict(want).get("vlan_id")
-
-        # Get the diff b/w want n have
-        want_dict = dict_to_set(want, sort_dictionary=True)
-        have_dict = dict_to_set(have, sort_dictionary=True)
-        diff = want_dict - have_dict
-
-        if diff:
-            name = dict(want).get("name")
-            state = dict(want).get("admin")
-            mtu = dict(want).get("mtu")
-
-            if 'vlan_id' in have.keys():
-                pass
-            else:
-                commands.append("vlan " + str(vlan)) 
-            if name:
-                commands.append("vlan " + str(vlan) + " name " + '"' + name + '"')
-            if state:
-                commands.append("vlan " + str(vlan) + " admin-state " + state)
-            if mtu:
-                commands.append("vlan " + str(vlan) + " mtu-ip " + str(mtu))
+        vlan = str(want.vlan_id)
+
+        if have is None:
+            commands.append("vlan " + vlan)
+            # A newly created VLAN comes up with the device defaults
+            have = VlanRecord(want.vlan_id, None, "enable", 1500)
+
+        # Get the diff b/w want n have, one command per changed attribute
+        diff = diff_records(want, have)
+        if "name" in diff:
+            commands.append("vlan " + vlan + " name " + '"' + diff["name"] + '"')
+        if "admin" in diff:
+            commands.append("vlan " + vlan + " admin-state " + diff["admin"])
+        if "mtu" in diff:
+            commands.append("vlan " + vlan + " mtu-ip " + str(diff["mtu"]))
 
         return commands
 
     def _clear_config(self, want, have):
-        # Delete the vlan config based on the want and have config
+        # Delete the vlan config based on the want and have config,
+        # want is None when there is no desired state for the VLAN
         commands = []
-        vlan = dict(have).get("vlan_id")
+        vlan = have.vlan_id
 
         if (
-            have.get("vlan_id")
-            and "default" not in have.get("name", "")
-            and (have.get("vlan_id") != want.get("vlan_id") or self.state == "deleted")
+            "default" not in (have.name or "")
+            and (want is None or have.vlan_id != want.vlan_id or self.state == "deleted")
         ):
-            # self.remove_command_from_config_list(vlan, "vlan", commands)
             commands.append("no vlan " + str(vlan))
-            if self.state == "overridden":
-                self.have_now.remove(have)
         return commands
@@ -37,6 +37,12 @@ class HostnameFacts(object):
         self.argument_spec = HostnameArgs.argument_spec
 
     def get_hostname_data(self, connection):
+        # The system name is the Name: of show system, which the connection
+        # reads once for the device info. Rendering the snapshot to grep it
+        # is the fallback for a device info without it or with an empty one.
+        hostname = connection.get_device_info().get("network_os_hostname")
+        if hostname:
+            return 'system name "{0}"'.format(hostname)
         return connection.get("show configuration snapshot | grep '^system name'")
 
     def populate_facts(self, connection, ansible_facts, data=None):
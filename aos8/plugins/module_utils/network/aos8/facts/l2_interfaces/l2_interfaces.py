@@ -23,6 +23,7 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common i
 from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.argspec.l2_interfaces.l2_interfaces import (
     L2_interfacesArgs,
 )
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import parse_port
 
 
 class L2_interfacesFacts(object):
@@ -54,11 +55,9 @@ class L2_interfacesFacts(object):
         :rtype: dictionary
         :returns: facts
         """
-        objs = []
-
         if not data:
             data = self.get_l2_interface_date(connection)
-            objs = self.parse_l2_interfaces(data)
+        objs = self.parse_l2_interfaces(data)
 
         facts = {}
         if objs:
@@ -79,16 +78,15 @@ class L2_interfacesFacts(object):
         for conf in config:
             match = re.match("^^\s+(?P<vlan_id>[\d]+)\s+(?P<port_number>(\d+\/\S+))\s+(?P<port_type>untagged|tagged)\s+(?P<status>.*)$", conf)
             if match:
-                port_number = match.group('port_number')
-                if re.match('(\d)+\/(\d)+\/(\d)+', port_number):
-                    port_type = 'port'
-                else:
-                    port_type = 'linkagg'
+                # a linkagg is shown as 0/<linkagg id>
+                port = parse_port(match.group('port_number'))
+                if port is None:
+                    continue
                 members_obj = {
                     'vlan_id' : match.group('vlan_id'),
-                    'port_number' : match.group('port_number'), 
+                    'port_number' : port.name, 
                     'mode' : match.group('port_type'),
-                    'port_type' : port_type,
+                    'port_type' : port.port_type,
                 }
                 objs.append(members_obj)
 
@@ -56,11 +56,9 @@ class VlansFacts(object):
         :rtype: dictionary
         :returns: facts
         """
-        objs = []
-
         if not data:
             data = self.get_vlans_data(connection)
-            objs = self.parse_vlan(data)
+        objs = self.parse_vlan(data)
 
         facts = {}
         if objs:
@@ -0,0 +1,250 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+The AOS8 fleet collector
+It collects the device info, the VLANs and the VLAN memberships of many
+switches at once, from a single process: each switch is an SSH session of
+an asyncio event loop instead of an Ansible fork with its own persistent
+connection. The outputs are parsed by the facts classes of the collection,
+so a record holds the same facts as aos8_facts, and the records are written
+as JSON lines, one per switch.
+
+It requires Python 3.7 or later and asyncssh, and runs on the controller:
+
+    python -m ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.fleet.collector \\
+        --inventory switches.txt --username admin --output fleet.jsonl
+
+The password is read from the AOS8_PASSWORD environment variable, the
+inventory file holds one switch per line, as host or host:port.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.parsers.parsers import (
+    parse_output,
+    parse_show_system,
+)
+
+
+try:
+    import asyncssh
+
+    HAS_ASYNCSSH = True
+except ImportError:
+    HAS_ASYNCSSH = False
+
+
+# The prompt and the errors of the AOS8 CLI, as in the terminal plugin
+PROMPT_RE = re.compile(r"[\r\n]?[\w\+\-\.:\/\[\]]+(?:\([^\)]+\)){0,3}(?:[>#]) ?$")
+ERROR_RE = re.compile(r"^\s*ERROR: .*$", re.M)
+
+# The commands run on each switch, keyed by the facts they are parsed into
+COMMANDS = (
+    ("device_info", "show system"),
+    ("vlans", "show vlan"),
+    ("l2_interfaces", "show vlan members"),
+)
+
+
+class CollectorError(Exception):
+    pass
+
+
+class Session(object):
+    """An interactive AOS8 CLI session over SSH
+
+    :param host: the address of the switch
+    :param port: the SSH port
+    :param options: the asyncssh connection options
+    :param timeout: the time allowed to each command, in seconds
+    """
+
+    def __init__(self, host, port=22, options=None, timeout=30):
+        self.host = host
+        self.port = port
+        self.options = options or {}
+        self.timeout = timeout
+        self._conn = None
+        self._process = None
+
+    async def open(self):
+        self._conn = await asyncio.wait_for(
+            asyncssh.connect(self.host, port=self.port, **self.options),
+            self.timeout,
+        )
+        # a wide terminal so that the table rows are not wrapped
+        self._process = await self._conn.create_process(term_type="vt100", term_size=(511, 0))
+        await self._read_prompt()
+
+    async def _read_prompt(self):
+        buf = ""
+        while True:
+            chunk = await asyncio.wait_for(self._process.stdout.read(65536), self.timeout)
+            if not chunk:
+                raise CollectorError("connection closed by {0}".format(self.host))
+            buf += chunk
+            # only the end of the buffer can hold the prompt
+            if PROMPT_RE.search(buf[-256:]):
+                return buf
+
+    async def get(self, command):
+        """Run a show command
+
+        :rtype: A string
+        :returns: the output of the command, without the echo and the prompt
+        """
+        self._process.stdin.write(command + "\n")
+        buf = await self._read_prompt()
+        lines = buf.replace("\r", "").split("\n")
+        output = "\n".join(lines[1:-1])
+        match = ERROR_RE.search(output)
+        if match:
+            raise CollectorError("{0}: {1}".format(command, match.group(0).strip()))
+        return output
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def parse_outputs(outputs):
+    """Parse the outputs of the collected commands
+
+    :param outputs: the output of each command, keyed by its facts
+    :rtype: A dictionary
+    :returns: the device info, vlans and l2_interfaces facts
+    """
+    device_info = {"network_os": "aos8"}
+    device_info.update(parse_show_system(outputs["device_info"]))
+    return {
+        "device_info": device_info,
+        "vlans": parse_output("show vlan", outputs["vlans"]),
+        "l2_interfaces": parse_output("show vlan members", outputs["l2_interfaces"]),
+    }
+
+
+async def collect_host(host, semaphore, port=22, options=None, timeout=30):
+    """Collect the facts of one switch, at most as many switches as the
+    semaphore allows being collected at the same time
+
+    :rtype: A dictionary
+    :returns: the record of the switch, with an error instead of the facts
+              when the collection failed
+    """
+    record = {"host": host, "port": port}
+    start = time.time()
+    async with semaphore:
+        session = Session(host, port=port, options=options, timeout=timeout)
+        try:
+            await session.open()
+            outputs = {}
+            for key, command in COMMANDS:
+                outputs[key] = await session.get(command)
+        except (OSError, asyncio.TimeoutError, CollectorError, asyncssh.Error) as exc:
+            record["error"] = str(exc) or exc.__class__.__name__
+        else:
+            record.update(parse_outputs(outputs))
+        finally:
+            session.close()
+    record["elapsed"] = round(time.time() - start, 3)
+    return record
+
+
+async def collect(hosts, output, concurrency=500, options=None, timeout=30):
+    """Collect the facts of the switches, writing a JSON line per switch
+    as soon as it is collected
+
+    :param hosts: the (host, port) of the switches
+    :param output: the file the records are written to
+    :param concurrency: the number of switches collected at the same time
+    :rtype: A tuple
+    :returns: the number of switches collected and failed
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        asyncio.ensure_future(collect_host(host, semaphore, port, options, timeout))
+        for host, port in hosts
+    ]
+    failed = 0
+    for task in asyncio.as_completed(tasks):
+        record = await task
+        if "error" in record:
+            failed += 1
+        output.write(json.dumps(record, sort_keys=True) + "\n")
+    return len(tasks) - failed, failed
+
+
+def read_inventory(path):
+    """Read the switches of an inventory file, one host or host:port per
+    line, blank lines and # comments are skipped
+
+    :rtype: A list
+    :returns: the (host, port) of the switches
+    """
+    hosts = []
+    with open(path) as fhand:
+        for line in fhand:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            host, _sep, port = line.rpartition(":") if line.count(":") == 1 else (line, "", "")
+            hosts.append((host, int(port) if port else 22))
+    return hosts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collect the facts of a fleet of AOS8 switches")
+    parser.add_argument("--inventory", required=True, help="file of the switches, one per line")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--output", default="-", help="the JSON lines file, - for stdout")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--timeout", type=int, default=30, help="seconds allowed to each step")
+    parser.add_argument(
+        "--no-host-key-checking",
+        action="store_true",
+        help="do not check the switches against the known hosts",
+    )
+    args = parser.parse_args(argv)
+
+    if not HAS_ASYNCSSH:
+        parser.error("asyncssh is required, it can be installed with pip install asyncssh")
+
+    options = {
+        "username": args.username,
+        "password": os.environ.get("AOS8_PASSWORD"),
+        "login_timeout": args.timeout,
+    }
+    if args.no_host_key_checking:
+        options["known_hosts"] = None
+
+    hosts = read_inventory(args.inventory)
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        collected, failed = asyncio.run(
+            collect(hosts, output, args.concurrency, options, args.timeout),
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    sys.stderr.write("{0} collected, {1} failed\n".format(collected, failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+The parsers of the AOS8 show commands output
+They transform the output of a show command into a list of dicts, one per
+table row or per record, so that the output can be used as structured data
+without any further text processing.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import re
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.facts.l2_interfaces.l2_interfaces import (
+    L2_interfacesFacts,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.facts.vlans.vlans import (
+    VlansFacts,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import (
+    PORT_RE,
+    parse_port,
+)
+
+SEPARATOR_RE = re.compile(r"^-+(\+-+)+\s*$")
+
+
+class TableParser(object):
+    """Parse the fixed width tables of the AOS8 show commands
+
+    The columns are delimited by the + of the line of dashes under the
+    header. A value wider than its column pushes the next column boundary
+    to the following blank, so that it is not split in two.
+
+    :param columns: the key of each column, in order
+    :param key: a regex the first column of a row has to match, the other
+                lines of the output are skipped
+    :param ints: the keys of the columns holding integers
+    :param words: the values never contain blanks, a row with one word per
+                  column is split on the blanks whatever its alignment
+    :param ports: the keys of the columns holding port identifiers, they
+                  are normalized and their port type is added under the
+                  key they are mapped to
+    """
+
+    def __init__(self, columns, key=None, ints=(), words=False, ports=None):
+        self.columns = columns
+        self.key = re.compile(key) if key else None
+        self.ints = frozenset(ints)
+        self.words = words
+        self.ports = ports or {}
+        # The column boundaries keyed by the separator line, they do not
+        # change from one output to the other of the same device
+        self._spans = {}
+
+    def spans(self, separator):
+        """Return the (start, end) of each column of the table, the end of
+        the last column being None.
+
+        :rtype: A list
+        :returns: the column spans
+        """
+        spans = self._spans.get(separator)
+        if spans is None:
+            ends = [match.start() for match in re.finditer(r"\+", separator)]
+            starts = [0] + ends
+            spans = list(zip(starts, ends + [None]))
+            self._spans[separator] = spans
+        return spans
+
+    def split(self, line, spans):
+        """Split a table row into its cells
+
+        :rtype: A list
+        :returns: the stripped value of each cell
+        """
+        cells = []
+        start = 0
+        length = len(line)
+        for _start, end in spans:
+            if end is None or end >= length:
+                end = length
+            else:
+                # do not split a value overflowing its column
+                while end < length and line[end - 1] != " " and line[end] != " ":
+                    end += 1
+            cells.append(line[start:end].strip())
+            start = end
+        return cells
+
+    def parse(self, output):
+        """Parse the table of the output of a show command
+
+        :rtype: A list
+        :returns: a dict per row of the table
+        """
+        objs = []
+        spans = None
+        for line in output.splitlines():
+            if spans is None:
+                if SEPARATOR_RE.match(line):
+                    spans = self.spans(line.rstrip())
+                continue
+            if not line.strip():
+                continue
+            cells = line.split() if self.words else None
+            if not cells or len(cells) != len(spans):
+                cells = self.split(line.rstrip(), spans)
+            if self.key and not self.key.match(cells[0]):
+                continue
+            obj = {}
+            for index, value in enumerate(cells):
+                name = self.columns[index] if index < len(self.columns) else "column_%d" % index
+                if not value:
+                    value = None
+                elif name in self.ints and value.isdigit():
+                    value = int(value)
+                elif name in self.ports:
+                    port = parse_port(value)
+                    if port is not None:
+                        value = port.name
+                        obj[self.ports[name]] = port.port_type
+                obj[name] = value
+            objs.append(obj)
+        return objs
+
+
+class RecordParser(object):
+    """Parse the "Key = Value," records of the AOS8 show commands
+
+    A new record is started by each line matching the record regex, its
+    named groups are the first keys of the record, along with the named
+    groups of the last line matching the context regex. The keys of the
+    other lines are lower cased, with the non alphanumeric characters
+    replaced by an underscore.
+
+    :param record: a regex matching the first line of a record
+    :param context: a regex matching a line shared by the next records
+    :param ints: the keys holding integers
+    :param ports: the keys of the record and context regexes holding port
+                  identifiers, they are normalized
+    """
+
+    ATTR_RE = re.compile(r"^\s*(?P<key>[^=]+?)\s*=\s*(?P<value>.*?),?\s*$")
+
+    def __init__(self, record, context=None, ints=(), ports=()):
+        self.record = re.compile(record)
+        self.context = re.compile(context) if context else None
+        self.ints = frozenset(ints)
+        self.ports = frozenset(ports)
+
+    def _groups(self, match):
+        groups = match.groupdict()
+        for name in self.ports.intersection(groups):
+            port = parse_port(groups[name])
+            if port is not None:
+                groups[name] = port.name
+        return groups
+
+    def parse(self, output):
+        """Parse the records of the output of a show command
+
+        :rtype: A list
+        :returns: a dict per record
+        """
+        objs = []
+        obj = None
+        context = {}
+        for line in output.splitlines():
+            match = self.context.match(line) if self.context else None
+            if match:
+                context = self._groups(match)
+                obj = None
+                continue
+            match = self.record.match(line)
+            if match:
+                obj = dict(context)
+                obj.update(self._groups(match))
+                objs.append(obj)
+                continue
+            match = self.ATTR_RE.match(line)
+            if match and obj is not None:
+                key = re.sub(r"[^0-9a-z]+", "_", match.group("key").lower()).strip("_")
+                value = match.group("value")
+                if key in self.ints and value.isdigit():
+                    value = int(value)
+                obj[key] = value
+        return objs
+
+
+class FactsParser(object):
+    """Parse the output of a show command with the facts class of a
+    resource module, so that the parsed output is the one gathered by the
+    module, validated against its argspec
+
+    :param facts: the facts class of the resource
+    :param resource: the name of the resource
+    """
+
+    def __init__(self, facts, resource):
+        self.facts = facts
+        self.resource = resource
+
+    def parse(self, output):
+        """Parse the output of a show command
+
+        :rtype: A list
+        :returns: the facts of the resource
+        """
+        # the facts classes fetch the data themselves when they get none
+        if not output.strip():
+            return []
+        facts = self.facts(None).populate_facts(
+            None,
+            {"ansible_network_resources": {}},
+            data=output,
+        )
+        return facts["ansible_network_resources"].get(self.resource, [])
+
+
+def parse_show_system(output):
+    """Parse the output of show system into the device info of the
+    cliconf plugin
+
+    :rtype: A dictionary
+    :returns: the model, version, uptime and hostname found in the output
+    """
+    device_info = {}
+    match = re.search(r"Alcatel-Lucent Enterprise\s([\w\s]+\-[\w]+)\s([0-9.RAG\s]+)\,", output)
+    if match:
+        device_info["network_os_model"] = match.group(1)
+        device_info["network_os_version"] = match.group(2)
+    match = re.search(r"Up Time:\s+(.*)\,", output, re.M)
+    if match:
+        device_info["network_os_uptime"] = match.group(1)
+    # an empty name is no hostname, the match does not go on to the next line
+    match = re.search(r"^[ \t]*Name:[ \t]*(.*?),?[ \t]*$", output, re.M)
+    if match and match.group(1):
+        device_info["network_os_hostname"] = match.group(1)
+    return device_info
+
+
+# The built-in parsers, keyed by the name given in the parser option of
+# aos8_command, as the arguments of their parser class
+PARSERS = {
+    "show vlan": (FactsParser, {"facts": VlansFacts, "resource": "vlans"}),
+    "show vlan members": (FactsParser, {"facts": L2_interfacesFacts, "resource": "l2_interfaces"}),
+    "show interfaces status": (
+        TableParser,
+        {
+            "columns": [
+                "port_number",
+                "admin_status",
+                "auto_nego",
+                "detected_speed",
+                "detected_duplex",
+                "detected_pause",
+                "detected_fec",
+                "configured_speed",
+                "configured_duplex",
+                "configured_pause",
+                "configured_fec",
+                "link_trap",
+                "eee",
+            ],
+            "key": PORT_RE.pattern,
+            "ports": {"port_number": "port_type"},
+            "words": True,
+        },
+    ),
+    "show ip interface": (
+        TableParser,
+        {
+            "columns": [
+                "name",
+                "ip_address",
+                "subnet_mask",
+                "status",
+                "forward",
+                "device",
+                "flags",
+            ],
+        },
+    ),
+    "show mac-learning": (
+        TableParser,
+        {
+            "columns": ["domain", "vlan_id", "mac_address", "type", "operation", "interface"],
+            "key": r"^[A-Z]+$",
+            "ints": ["vlan_id"],
+            "ports": {"interface": "interface_type"},
+            "words": True,
+        },
+    ),
+    "show lldp remote-system": (
+        RecordParser,
+        {
+            "context": r"^\s*Remote LLDP .*Agents on Local Port (?P<local_port>\S+?):\s*$",
+            "ports": ["local_port"],
+            "record": r"^\s*Chassis (?P<chassis_id>\S+?), Port (?P<port_id>.+?):\s*$",
+            "ints": ["remote_id"],
+        },
+    ),
+}
+
+_COMPILED_PARSERS = {}
+
+
+def get_parser(name):
+    """Return the built-in parser of a show command, compiled on first use
+    and shared by all the later calls.
+
+    :rtype: A TableParser, RecordParser or FactsParser
+    :returns: the parser, None when there is no parser of that name
+    """
+    parser = _COMPILED_PARSERS.get(name)
+    if parser is None and name in PARSERS:
+        cls, kwargs = PARSERS[name]
+        parser = _COMPILED_PARSERS[name] = cls(**kwargs)
+    return parser
+
+
+def parse_output(name, output):
+    """Parse the output of a show command with a built-in parser
+
+    :rtype: A list
+    :returns: the parsed output
+    """
+    return get_parser(name).parse(output)
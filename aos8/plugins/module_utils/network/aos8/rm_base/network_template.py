@@ -0,0 +1,386 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+The AOS8 base class of the resource module templates
+It parses and renders the config lines as the netcommon NetworkTemplate
+does, with the parsers indexed by the leading keyword of their regex and
+the simple Jinja templates compiled into format strings, once per template
+class.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import ast
+import re
+
+from itertools import chain
+
+from ansible.module_utils.common._collections_compat import Mapping
+from ansible.module_utils.six import iteritems, string_types
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.network_template import (
+    NetworkTemplate,
+)
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
+    Template,
+)
+
+
+try:
+    from jinja2.exceptions import UndefinedError
+except ImportError:
+    UndefinedError = None
+
+
+# The literal first word of a getval regex, followed by a mandatory blank
+KEYWORD_RE = re.compile(r"^\^([A-Za-z0-9_-]+)(?: |\\s)(?![?*{])")
+# The first word of a config line, empty when the line is indented
+LINE_KEYWORD_RE = re.compile(r"\S*")
+# A Jinja expression which is a plain variable lookup, such as {{ vlan.name }}
+VARIABLE_RE = re.compile(r"{{\s*([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)\s*}}")
+
+
+class _Undefined(Exception):
+    pass
+
+
+def _has_top_level_alternation(pattern):
+    """Tell if a regex has a | outside of any group or character class"""
+    depth = 0
+    escaped = in_class = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and not depth:
+            return True
+    return False
+
+
+def line_keyword(getval):
+    """The first word of the lines a getval regex can match
+
+    :rtype: A string
+    :returns: the literal word the regex starts with, followed by a
+              mandatory blank, None when the lines it matches may start
+              with another word, as with a top-level alternation
+    """
+    match = KEYWORD_RE.match(getval)
+    if not match or _has_top_level_alternation(getval):
+        return None
+    return match.group(1)
+
+
+class FormatTemplate(object):
+    """A Jinja template made of plain variable lookups, rendered with
+    str.format. The rendered value is converted as the netcommon Template
+    does: a Python literal is evaluated and an empty string is None.
+
+    :param value: the Jinja template
+    """
+
+    __slots__ = ("fmt", "names")
+
+    def __init__(self, value):
+        parts = []
+        self.names = []
+        start = 0
+        for match in VARIABLE_RE.finditer(value):
+            parts.append(value[start:match.start()].replace("{", "{{").replace("}", "}}"))
+            parts.append("{%d}" % len(self.names))
+            self.names.append(match.group(1).split("."))
+            start = match.end()
+        parts.append(value[start:].replace("{", "{{").replace("}", "}}"))
+        self.fmt = "".join(parts)
+
+    @classmethod
+    def compile(cls, value):
+        """Compile a Jinja template when it has no Jinja logic
+
+        :rtype: A FormatTemplate, or the value itself
+        :returns: the compiled template, the value when it has no Jinja
+                  markup, None when it can only be rendered by Jinja
+        """
+        if not isinstance(value, string_types):
+            return None
+        if "{{" not in value and "{%" not in value and "{#" not in value:
+            return value
+        if "{%" in value or "{#" in value or value.endswith("\n"):
+            return None
+        if "{{" in VARIABLE_RE.sub("", value):
+            return None
+        template = cls(value)
+        for name in template.names:
+            # Jinja resolves an attribute of the dict before its key
+            if any(hasattr(dict, key) for key in name[1:]):
+                return None
+        return template
+
+    def render(self, data):
+        """Render the template, raising _Undefined for a missing variable"""
+        values = []
+        for name in self.names:
+            value = data
+            for key in name:
+                if not isinstance(value, Mapping) or key not in value:
+                    raise _Undefined(key)
+                value = value[key]
+            values.append(value)
+        value = self.fmt.format(*values)
+        if not value:
+            return None
+        try:
+            return ast.literal_eval(value)
+        except Exception:
+            return str(value)
+
+    def __call__(self, data):
+        try:
+            return self.render(data)
+        except _Undefined:
+            return None
+
+
+def _compile_result(tmplt):
+    """Compile all the keys and values of the result of a parser
+
+    :rtype: A tuple
+    :returns: the compiled result, None when one of its templates can only
+              be rendered by Jinja
+    """
+    if isinstance(tmplt, dict):
+        items = []
+        for key, value in iteritems(tmplt):
+            ckey = FormatTemplate.compile(key) if isinstance(key, string_types) else key
+            cvalue = _compile_result(value)
+            if ckey is None or cvalue is None:
+                return None
+            items.append((ckey, isinstance(value, string_types), cvalue))
+        return ("dict", items)
+    if isinstance(tmplt, list):
+        items = [_compile_result(each) for each in tmplt]
+        if any(each is None for each in items):
+            return None
+        return ("list", items)
+    if isinstance(tmplt, string_types):
+        value = FormatTemplate.compile(tmplt)
+        return None if value is None else ("str", value)
+    return ("value", tmplt)
+
+
+def _render_result(compiled, data):
+    """Render a compiled result as NetworkTemplate._deepformat does, a
+    string value rendered as None is left out of its dict.
+    """
+    kind, value = compiled
+    if kind == "dict":
+        result = {}
+        for key, is_string, item in value:
+            if isinstance(key, FormatTemplate):
+                key = key.render(data)
+            item = _render_result(item, data)
+            if is_string and item is None:
+                continue
+            result[key] = item
+        return result
+    if kind == "list":
+        return [_render_result(each, data) for each in value]
+    if kind == "str":
+        return value(data) if isinstance(value, FormatTemplate) else value
+    return value
+
+
+def merge_into(base, other):
+    """Merge other into base, in place, with the outcome of the netcommon
+    dict_merge(base, other) but without copying base on every call.
+
+    :rtype: A dictionary
+    :returns: base
+    """
+    for key, item in iteritems(other):
+        if key not in base:
+            base[key] = item
+            continue
+        value = base[key]
+        if item is None:
+            base[key] = None
+        elif isinstance(value, dict):
+            if isinstance(item, Mapping):
+                merge_into(value, item)
+            else:
+                base[key] = item
+        elif isinstance(value, list):
+            try:
+                base[key] = list(set(chain(value, item)))
+            except TypeError:
+                value.extend([i for i in item if i not in value])
+        elif value != item:
+            base[key] = item
+    return base
+
+
+class CachedTemplate(Template):
+    """The netcommon Template, with each Jinja template compiled once"""
+
+    def __init__(self):
+        super(CachedTemplate, self).__init__()
+        self._compiled = {}
+
+    def __call__(self, value, variables=None, fail_on_undefined=True):
+        variables = variables or {}
+
+        if not self.contains_vars(value):
+            return value
+
+        template = self._compiled.get(value)
+        if template is None:
+            template = self._compiled[value] = self.env.from_string(value)
+        try:
+            value = template.render(variables)
+        except UndefinedError:
+            if not fail_on_undefined:
+                return None
+            raise
+
+        if value:
+            try:
+                return ast.literal_eval(value)
+            except Exception:
+                return str(value)
+        else:
+            return None
+
+
+class _CompiledParsers(object):
+    """The parsers of a template class, compiled and indexed"""
+
+    def __init__(self, parsers):
+        self.by_name = {}
+        by_keyword = {}
+        fallback = []
+        for index, parser in enumerate(parsers):
+            self.by_name.setdefault(parser["name"], parser)
+            getval = parser.get("getval")
+            if getval is None:
+                continue
+            if isinstance(getval, string_types):
+                keyword = line_keyword(getval)
+                regex = re.compile(getval)
+            else:
+                # a compiled regex may be verbose, it is tried on every line
+                keyword = None
+                regex = getval
+            result = _compile_result(parser.get("result", {}))
+            entry = (index, regex, parser, result)
+            if keyword is not None:
+                by_keyword.setdefault(keyword, []).append(entry)
+            else:
+                fallback.append(entry)
+
+        # The parsers keep their order, the first match wins
+        self.fallback = fallback
+        self.by_keyword = dict(
+            (keyword, sorted(entries + fallback, key=lambda e: e[0]))
+            for keyword, entries in iteritems(by_keyword)
+        )
+        self.templates = {}
+        for parser in self.by_name.values():
+            for key in ("setval", "remval"):
+                tmplt = parser.get(key)
+                if isinstance(tmplt, string_types):
+                    self.templates[id(tmplt)] = FormatTemplate.compile(tmplt)
+
+    def candidates(self, line):
+        """Return the parsers which can match a line, in order"""
+        keyword = LINE_KEYWORD_RE.match(line).group()
+        return self.by_keyword.get(keyword, self.fallback)
+
+
+_COMPILED = {}
+
+
+class Aos8NetworkTemplate(NetworkTemplate):
+    """The base class of the AOS8 resource module templates
+
+    A line is only tried against the parsers whose getval starts with the
+    first word of the line, plus the parsers without a literal first word,
+    and the setval, remval and result templates which are plain variable
+    lookups are rendered without Jinja. The outcome is the one of the
+    netcommon NetworkTemplate.
+    """
+
+    _shared_template = None
+
+    def __init__(self, lines=None, tmplt=None, prefix=None, module=None):
+        super(Aos8NetworkTemplate, self).__init__(
+            lines=lines,
+            tmplt=tmplt,
+            prefix=prefix,
+            module=module,
+        )
+        # The other templates are rendered by Jinja, compiled on first use
+        # and shared by all the instances
+        if Aos8NetworkTemplate._shared_template is None:
+            Aos8NetworkTemplate._shared_template = CachedTemplate()
+        self._template = Aos8NetworkTemplate._shared_template
+
+    def _compiled(self):
+        tmplt = self._tmplt
+        compiled = _COMPILED.get(type(tmplt))
+        if compiled is None:
+            compiled = _COMPILED[type(tmplt)] = _CompiledParsers(tmplt.PARSERS)
+        return compiled
+
+    def parse(self):
+        """parse"""
+        compiled = self._compiled()
+        result = {}
+        shared = {}
+        for line in self._lines:
+            for _index, regex, parser, cresult in compiled.candidates(line):
+                cap = regex.match(line)
+                if cap:
+                    capdict = dict((k, v) for k, v in iteritems(cap.groupdict()) if v is not None)
+                    if parser.get("shared"):
+                        shared = capdict
+                    vals = merge_into(dict(capdict), shared) if shared else capdict
+                    res = None
+                    if cresult is not None:
+                        try:
+                            res = _render_result(cresult, vals)
+                        except _Undefined:
+                            # let Jinja raise the error of an undefined key
+                            res = None
+                    if res is None:
+                        res = self._deepformat(parser["result"], vals)
+                    merge_into(result, res)
+                    break
+        return result
+
+    def get_parser(self, name):
+        """get_parsers"""
+        parser = self._compiled().by_name.get(name)
+        if parser is None:
+            return super(Aos8NetworkTemplate, self).get_parser(name)
+        return parser
+
+    def _render(self, tmplt, data, negate):
+        compiled = self._compiled().templates.get(id(tmplt)) if isinstance(tmplt, string_types) else None
+        if isinstance(compiled, FormatTemplate):
+            tmplt = compiled
+        return super(Aos8NetworkTemplate, self)._render(tmplt, data, negate)
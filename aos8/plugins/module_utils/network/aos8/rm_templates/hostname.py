@@ -15,11 +15,11 @@ the given network resource.
 """
 
 import re
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.network_template import (
-    NetworkTemplate,
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.rm_base.network_template import (
+    Aos8NetworkTemplate,
 )
 
-class HostnameTemplate(NetworkTemplate):
+class HostnameTemplate(Aos8NetworkTemplate):
     def __init__(self, lines=None, module=None):
         super(HostnameTemplate, self).__init__(lines=lines, tmplt=self, module=module)
 
@@ -11,12 +11,436 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import hashlib
+import json
+import re
 import socket
+import time
 
+from collections import namedtuple
+from contextlib import contextmanager
 from itertools import count, groupby
 
 from ansible.module_utils.common.network import is_masklen, to_netmask
-from ansible.module_utils.six import iteritems
+from ansible.module_utils.six import iteritems, string_types
+
+
+# Immutable, hashable records for the entries of the VLAN and VLAN
+# membership resources. They are built once from the want and have
+# dicts so that diffing is a plain tuple comparison / set difference.
+VlanRecord = namedtuple("VlanRecord", ["vlan_id", "name", "admin", "mtu"])
+MemberRecord = namedtuple("MemberRecord", ["vlan_id", "port_number", "mode", "port_type"])
+
+
+class VlanSet(object):
+    """
+    A set of VLAN IDs stored as the bits of an integer, the bit N being set
+    when the VLAN N is in the set. Membership is a bit test, union,
+    intersection and difference are a single bitwise operation on the
+    4096 bits of the VLAN ID space, and the set is iterated in ascending
+    order without sorting.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, vlans=None):
+        bits = 0
+        for vlan in vlans or []:
+            bits |= 1 << int(vlan)
+        self.bits = bits
+
+    @classmethod
+    def from_bits(cls, bits):
+        """Returns the VlanSet of the given bits"""
+        vlans = cls()
+        vlans.bits = bits
+        return vlans
+
+    @classmethod
+    def from_range(cls, vlan_range):
+        """
+        Returns the VlanSet of an AOS8 VLAN range such as "1-3,10 20",
+        or of a list of such ranges.
+        """
+        if not isinstance(vlan_range, string_types):
+            vlan_range = ",".join(vlan_range)
+        bits = 0
+        for part in re.split(r"[,\s]+", vlan_range.strip()):
+            if not part:
+                continue
+            start, _sep, end = part.partition("-")
+            start = int(start)
+            end = int(end) if end else start
+            bits |= ((1 << (end - start + 1)) - 1) << start
+        return cls.from_bits(bits)
+
+    def ranges(self):
+        """Yields the (first, last) VLAN IDs of each contiguous range, in order"""
+        bits = self.bits
+        while bits:
+            first = (bits & -bits).bit_length() - 1
+            run = bits >> first
+            length = (~run & (run + 1)).bit_length() - 1
+            yield first, first + length - 1
+            bits &= ~(((1 << length) - 1) << first)
+
+    def range_strings(self):
+        """Yields the AOS8 VLAN range of each contiguous range, such as "1-3" """
+        for first, last in self.ranges():
+            yield str(first) if first == last else "{0}-{1}".format(first, last)
+
+    def to_range(self):
+        """Returns the AOS8 VLAN range of the set, such as "1-3,10" """
+        return ",".join(self.range_strings())
+
+    def add(self, vlan):
+        self.bits |= 1 << int(vlan)
+
+    def discard(self, vlan):
+        self.bits &= ~(1 << int(vlan))
+
+    def __contains__(self, vlan):
+        return bool(self.bits >> int(vlan) & 1)
+
+    def __iter__(self):
+        for first, last in self.ranges():
+            for vlan in range(first, last + 1):
+                yield vlan
+
+    def __len__(self):
+        return bin(self.bits).count("1")
+
+    def __bool__(self):
+        return self.bits != 0
+
+    __nonzero__ = __bool__
+
+    def __or__(self, other):
+        return VlanSet.from_bits(self.bits | other.bits)
+
+    def __and__(self, other):
+        return VlanSet.from_bits(self.bits & other.bits)
+
+    def __sub__(self, other):
+        return VlanSet.from_bits(self.bits & ~other.bits)
+
+    def __xor__(self, other):
+        return VlanSet.from_bits(self.bits ^ other.bits)
+
+    def __eq__(self, other):
+        return isinstance(other, VlanSet) and self.bits == other.bits
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __repr__(self):
+        return "VlanSet({0!r})".format(self.to_range())
+
+
+def to_vlan_record(vlan):
+    """Returns the VlanRecord of a VLAN dict with normalized value types"""
+    mtu = vlan.get("mtu")
+    return VlanRecord(
+        int(vlan["vlan_id"]),
+        vlan.get("name"),
+        vlan.get("admin"),
+        int(mtu) if mtu is not None else None,
+    )
+
+
+def diff_records(want, have):
+    """
+    Returns a dict of the fields of the want record whose value is set
+    and differs from the value of the same field in the have record.
+    Both records must be of the same type, with normalized value types.
+    """
+    return dict(
+        (field, w)
+        for field, w, h in zip(want._fields, want, have)
+        if w is not None and w != h
+    )
+
+
+class Port(namedtuple("Port", ["kind", "chassis", "slot", "number", "sub", "name"])):
+    """
+    An AOS8 port identifier, either a chassis/slot/port such as 1/1/1, with
+    a sub-port letter such as 1/1/49A, or a linkagg ID. The ports are
+    ordered naturally, physical ports first by chassis, slot, port and
+    sub-port, then the linkaggs by ID. Get them with parse_port so that a
+    given port is parsed once and shared by all its users.
+    """
+
+    __slots__ = ()
+
+    PORT = 0
+    LINKAGG = 1
+
+    @property
+    def port_type(self):
+        """The AOS8 keyword of the port, port or linkagg"""
+        return "linkagg" if self.kind == Port.LINKAGG else "port"
+
+    def __str__(self):
+        return self.name
+
+    def __hash__(self):
+        # the hash of the name is cached by the string
+        return hash(self.name)
+
+
+PORT_RE = re.compile(r"^(?:(\d+)/(\d+)/(\d+)([A-Za-z]?)|(?:0/)?(\d+))$")
+PORT_RANGE_RE = re.compile(r"^(\d+/\d+/)(\d+)-(\d+)$")
+_PORTS = {}
+_PORT_RANGES = {}
+
+
+def parse_port(port):
+    """
+    Returns the interned Port of a port identifier, such as "1/1/1",
+    "1/1/49A" or the linkagg "5", also shown as "0/5" by the device, None
+    when it is not a port identifier.
+    """
+    try:
+        return _PORTS[port]
+    except KeyError:
+        pass
+    except TypeError:
+        # a Port is hashable, anything else unhashable is not a port
+        return None
+    match = PORT_RE.match(str(port).strip())
+    if not match:
+        value = None
+    elif match.group(5) is not None:
+        number = int(match.group(5))
+        value = Port(Port.LINKAGG, 0, 0, number, "", str(number))
+    else:
+        chassis, slot, number, sub = match.groups()[:4]
+        chassis, slot, number, sub = int(chassis), int(slot), int(number), sub.upper()
+        value = Port(Port.PORT, chassis, slot, number, sub, "{0}/{1}/{2}{3}".format(chassis, slot, number, sub))
+    if value is not None:
+        # every spelling of a port resolves to the same instance
+        value = _PORTS.setdefault(value.name, value)
+        _PORTS[value] = value
+    _PORTS[port] = value
+    return value
+
+
+def port_sort_key(port):
+    """Returns the natural sort key of a port identifier, non port identifiers last"""
+    value = parse_port(port)
+    if value is None:
+        return (Port.LINKAGG + 1, 0, 0, 0, "", str(port))
+    return value
+
+
+def expand_ports(ports):
+    """
+    Returns the list of the Port of a port identifier or of a port range
+    such as "1/1/1-24", an empty list when it is not a port identifier.
+    """
+    try:
+        return _PORT_RANGES[ports]
+    except KeyError:
+        pass
+    match = PORT_RANGE_RE.match(ports)
+    if not match:
+        port = parse_port(ports)
+        expanded = [port] if port is not None else []
+    else:
+        expanded = [
+            parse_port(match.group(1) + str(number))
+            for number in range(int(match.group(2)), int(match.group(3)) + 1)
+        ]
+    _PORT_RANGES[ports] = expanded
+    return list(expanded)
+
+
+def compact_ports(ports):
+    """
+    Returns the port ranges, such as "1/1/1-24", of a list of port
+    identifiers, in their natural order. Sub-ports and linkaggs are not
+    part of ranges, as the CLI only accepts ranges of physical ports.
+    """
+    ranges = []
+    ports = sorted(
+        set(
+            port if isinstance(port, Port) else parse_port(port)
+            for port in ports
+        ).difference([None]),
+    )
+    for key, group in groupby(ports, lambda p: (p.kind, p.chassis, p.slot, p.sub)):
+        if key[0] == Port.LINKAGG or key[3]:
+            ranges.extend(port.name for port in group)
+            continue
+        for numbers in get_ranges([port.number for port in group]):
+            ranges.append(
+                "{0}/{1}/{2}".format(key[1], key[2], vlan_list_to_range(numbers)),
+            )
+    return ranges
+
+
+def to_member_record(member):
+    """Returns the MemberRecord of a VLAN membership dict with normalized value types,
+    the port_type and the port_number are those of the parsed port identifier
+    """
+    port = parse_port(member["port_number"])
+    if port is None:
+        port_number = member["port_number"]
+        port_type = member.get("port_type")
+    else:
+        port_number = port.name
+        port_type = port.port_type
+    return MemberRecord(int(member["vlan_id"]), port_number, member.get("mode"), port_type)
+
+
+class MembershipMatrix(object):
+    """
+    The VLAN memberships of a set of ports: for each port the bits of its
+    tagged VLANs, as in VlanSet, and its untagged VLAN. The ports are
+    interned Port, each one indexing the tagged and untagged arrays, so a
+    port costs two integers whatever the number of its VLANs and the
+    memberships of two matrices are compared port by port with bitwise
+    operations. A port which is untagged in no VLAN is in the default
+    VLAN, which it can only leave by being untagged in another one.
+    """
+
+    DEFAULT_VLAN = 1
+
+    __slots__ = ("ports", "tagged", "untagged", "_index")
+
+    def __init__(self):
+        self.ports = []
+        self.tagged = []
+        self.untagged = []
+        self._index = {}
+
+    @classmethod
+    def from_records(cls, records):
+        """Returns the MembershipMatrix of a list of MemberRecord"""
+        matrix = cls()
+        for each in records:
+            matrix.add(each.vlan_id, each.port_number, each.mode)
+        return matrix
+
+    def _slot(self, port):
+        index = self._index.get(port)
+        if index is None:
+            index = self._index[port] = len(self.ports)
+            self.ports.append(port)
+            self.tagged.append(0)
+            self.untagged.append(None)
+        return index
+
+    def add(self, vlan_id, port_number, mode):
+        """
+        Adds a membership, raises ValueError when the port number is not
+        a port identifier or when the port is already untagged in another
+        VLAN.
+        """
+        port = parse_port(port_number)
+        if port is None:
+            raise ValueError("invalid port_number {0}".format(port_number))
+        index = self._slot(port)
+        vlan_id = int(vlan_id)
+        if mode == "untagged":
+            untagged = self.untagged[index]
+            if untagged is not None and untagged != vlan_id:
+                raise ValueError(
+                    "port {0} can only be untagged in one VLAN, got {1} and {2}".format(
+                        port.name,
+                        untagged,
+                        vlan_id,
+                    ),
+                )
+            self.untagged[index] = vlan_id
+        else:
+            self.tagged[index] |= 1 << vlan_id
+
+    def __contains__(self, port):
+        return port in self._index
+
+    def get(self, port):
+        """Returns the bits of the tagged VLANs and the untagged VLAN of a Port"""
+        index = self._index.get(port)
+        if index is None:
+            return 0, None
+        return self.tagged[index], self.untagged[index]
+
+    def default_vlan(self, port):
+        """Returns the untagged VLAN of a Port, the default VLAN when it has none"""
+        untagged = self.get(port)[1]
+        return self.DEFAULT_VLAN if untagged is None else untagged
+
+    def untagged_by_port(self):
+        """Returns the untagged VLAN keyed by port number"""
+        return dict(
+            (port.name, untagged)
+            for port, untagged in zip(self.ports, self.untagged)
+            if untagged is not None
+        )
+
+    def records(self, port, tagged_bits=0, untagged=None):
+        """Returns the MemberRecord of the given memberships of a Port"""
+        records = []
+        if untagged is not None:
+            records.append(MemberRecord(untagged, port.name, "untagged", port.port_type))
+        for vlan_id in VlanSet.from_bits(tagged_bits):
+            records.append(MemberRecord(vlan_id, port.name, "tagged", port.port_type))
+        return records
+
+    def to_records(self):
+        """Returns all the memberships as MemberRecord, in the natural port order"""
+        records = []
+        for port in sorted(self.ports):
+            records.extend(self.records(port, *self.get(port)))
+        return records
+
+    def dumps(self):
+        """
+        Returns the compact text form of the matrix, one
+        "<port>:<untagged VLAN>:<tagged VLAN range>" field per port
+        """
+        return " ".join(
+            "{0}:{1}:{2}".format(
+                port.name,
+                "" if untagged is None else untagged,
+                VlanSet.from_bits(tagged).to_range(),
+            )
+            for port, tagged, untagged in zip(self.ports, self.tagged, self.untagged)
+        )
+
+    @classmethod
+    def loads(cls, text):
+        """Returns the MembershipMatrix of the text returned by dumps"""
+        matrix = cls()
+        for field in text.split():
+            port_number, untagged, tagged = field.split(":")
+            port = parse_port(port_number)
+            if port is None:
+                raise ValueError("invalid port_number {0}".format(port_number))
+            index = matrix._slot(port)
+            matrix.tagged[index] = VlanSet.from_range(tagged).bits
+            matrix.untagged[index] = int(untagged) if untagged else None
+        return matrix
+
+    def _memberships(self):
+        # the memberships keyed by port, without the ports which have none
+        return dict(
+            (port, (tagged, untagged))
+            for port, tagged, untagged in zip(self.ports, self.tagged, self.untagged)
+            if tagged or untagged is not None
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, MembershipMatrix) and self._memberships() == other._memberships()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
 
 
 def remove_command_from_config_list(interface, cmd, commands):
@@ -279,6 +703,10 @@ def normalize_interface(name):
     if not name:
         return
 
+    port = parse_port(name)
+    if port is not None:
+        return port.name
+
     def _get_number(name):
         digits = ""
         for char in name:
@@ -433,4 +861,266 @@ def sort_dict(dictionary):
             sorted_dict[key] = sort_dict(value)
         else:
             sorted_dict[key] = value
-    return sorted_dict
\ No newline at end of file
+    return sorted_dict
+
+
+def compress_vlan_commands(commands):
+    """
+    Groups "[no ]vlan <id> <rest>" commands which only differ by
+    their VLAN ID into one command per contiguous VLAN range, e.g.
+    "vlan 10 admin-state enable" and "vlan 11 admin-state enable"
+    become "vlan 10-11 admin-state enable".
+    VLAN creation commands are emitted first so that the VLANs exist
+    before any of their attributes are set, the other groups keep the
+    order in which they first appear. Any other command is passed
+    through unchanged.
+    """
+    vlan_re = re.compile(r"^(no )?vlan (\d+)( .*)?$")
+    groups = dict()
+    order = []
+    for cmd in commands:
+        match = vlan_re.match(cmd)
+        if match:
+            key = (match.group(1) or "", match.group(3) or "")
+            vlan = int(match.group(2))
+        else:
+            key = cmd
+            vlan = None
+        if key not in groups:
+            groups[key] = VlanSet()
+            order.append(key)
+        if vlan is not None:
+            groups[key].add(vlan)
+
+    order.sort(key=lambda k: k != ("", ""))
+    compressed = []
+    for key in order:
+        if not isinstance(key, tuple):
+            compressed.append(key)
+            continue
+        for vlan_range in groups[key].range_strings():
+            compressed.append("{0}vlan {1}{2}".format(key[0], vlan_range, key[1]))
+    return compressed
+
+
+def compress_port_commands(commands):
+    """
+    Groups "[no ]vlan <id> members port <chassis>/<slot>/<port> <rest>"
+    commands which only differ by the port number into one command per
+    contiguous port range on the same chassis and slot, e.g.
+    "vlan 10 members port 1/1/1 tagged" and "vlan 10 members port 1/1/2 tagged"
+    become "vlan 10 members port 1/1/1-2 tagged".
+    The groups keep the order in which they first appear and any other
+    command is passed through unchanged.
+    """
+    port_re = re.compile(r"^(no )?vlan (\d+) members port (\S+)( .*)?$")
+    groups = dict()
+    order = []
+    for cmd in commands:
+        match = port_re.match(cmd)
+        ports = expand_ports(match.group(3)) if match else None
+        if ports:
+            key = (match.group(1) or "", match.group(2), match.group(4) or "")
+        else:
+            key = cmd
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        if ports:
+            groups[key].extend(ports)
+
+    compressed = []
+    for key in order:
+        if not isinstance(key, tuple):
+            compressed.append(key)
+            continue
+        for ports in compact_ports(groups[key]):
+            compressed.append(
+                "{0}vlan {1} members port {2}{3}".format(key[0], key[1], ports, key[2]),
+            )
+    return compressed
+
+
+def expand_port_range(ports):
+    """
+    Expands a port range such as "1/1/1-3" into the list of its
+    ports ["1/1/1", "1/1/2", "1/1/3"], any other port or linkagg
+    ID is returned as a single element list.
+    """
+    return [port.name for port in expand_ports(ports)] or [ports]
+
+
+def _vlan_rollback(no, vlan_range, attr, vlans, vlan_members):
+    # Commands reverting a "[no ]vlan <range>[ <attr> <value>]" command, a
+    # deleted VLAN is created again with its port memberships
+    undo = []
+    member_undo = []
+    if not no and not attr:
+        undo.append("no vlan " + vlan_range)
+    for vlan_id in VlanSet.from_range(vlan_range):
+        have = vlans.get(vlan_id)
+        if have is None:
+            continue
+        if no:
+            undo.append("vlan {0}".format(vlan_id))
+        if have.name and (no or attr == "name"):
+            undo.append('vlan {0} name "{1}"'.format(vlan_id, have.name))
+        if have.admin and (no or attr == "admin-state"):
+            undo.append("vlan {0} admin-state {1}".format(vlan_id, have.admin))
+        if have.mtu and (no or attr == "mtu-ip"):
+            undo.append("vlan {0} mtu-ip {1}".format(vlan_id, have.mtu))
+    if no and vlan_members is not None:
+        member_undo = vlan_members_rollback(vlan_range, vlan_members)
+    return compress_vlan_commands(undo) + member_undo
+
+
+def vlan_members_rollback(vlan_range, vlan_members):
+    """
+    Returns the commands restoring the port memberships of the VLANs
+    deleted by a "no vlan <range>" command.
+
+    :param vlan_range: the VLAN range of the command
+    :param vlan_members: the MemberRecord of the current configuration, by VLAN ID
+    :rtype: A list
+    :returns: the "vlan <ID> members" commands
+    """
+    undo = []
+    for vlan_id in VlanSet.from_range(vlan_range):
+        for member in vlan_members.get(vlan_id, ()):
+            undo.append(
+                "vlan {0} members {1} {2} {3}".format(
+                    vlan_id,
+                    member.port_type,
+                    member.port_number,
+                    member.mode,
+                ),
+            )
+    return compress_vlan_commands(compress_port_commands(undo))
+
+
+def _member_rollback(no, vlan_range, port_type, port_range, mode, members, untagged):
+    # Commands reverting a "[no ]vlan <range> members <type> <ports>[ <mode>]" command
+    undo = []
+    for vlan_id in VlanSet.from_range(vlan_range):
+        for port in expand_port_range(port_range):
+            if no:
+                have = members.get((port, vlan_id))
+                if have:
+                    undo.append(
+                        "vlan {0} members {1} {2} {3}".format(vlan_id, port_type, port, have.mode),
+                    )
+            elif mode == "untagged" and untagged.get(port, vlan_id) != vlan_id:
+                # adding a port untagged moved its default VLAN, move it back
+                undo.append(
+                    "vlan {0} members {1} {2} untagged".format(untagged[port], port_type, port),
+                )
+            else:
+                undo.append("no vlan {0} members {1} {2}".format(vlan_id, port_type, port))
+    return compress_vlan_commands(compress_port_commands(undo))
+
+
+def rollback_candidate(commands, vlans=None, members=None):
+    """
+    Returns the edit_config candidate of the commands, each line
+    carrying under "rollback" the commands which revert it to the
+    current configuration.
+
+    Without the memberships, a "no vlan" line carries its VLAN range
+    under "members" instead of the commands restoring the memberships
+    of the VLANs, which the cliconf plugin collects from the device
+    only when it rolls back on error.
+
+    :param commands: the commands generated by the resource modules
+    :param vlans: the current configuration as a list of VlanRecord
+    :param members: the current configuration as a list of MemberRecord
+    :rtype: A list
+    :returns: the list of {"command": ..., "rollback": [...]} lines
+    """
+    vlan_re = re.compile(r"^(no )?vlan ([\d-]+)(?: (name|admin-state|mtu-ip) .*)?$")
+    member_re = re.compile(r"^(no )?vlan ([\d-]+) members (port|linkagg) (\S+)(?: (tagged|untagged))?$")
+    vlans = dict((each.vlan_id, each) for each in vlans or [])
+    member_index = dict(((each.port_number, each.vlan_id), each) for each in members or [])
+    untagged = dict(
+        (each.port_number, each.vlan_id) for each in members or [] if each.mode == "untagged"
+    )
+    vlan_members = None
+    if members is not None:
+        vlan_members = {}
+        for each in members:
+            vlan_members.setdefault(each.vlan_id, []).append(each)
+
+    candidate = []
+    for cmd in commands:
+        undo = []
+        match = member_re.match(cmd)
+        if match:
+            undo = _member_rollback(*match.groups(), members=member_index, untagged=untagged)
+        else:
+            match = vlan_re.match(cmd)
+            if match:
+                undo = _vlan_rollback(*match.groups(), vlans=vlans, vlan_members=vlan_members)
+                if match.group(1) and not match.group(3) and vlan_members is None:
+                    candidate.append({"command": cmd, "rollback": undo, "members": match.group(2)})
+                    continue
+        candidate.append({"command": cmd, "rollback": undo})
+    return candidate
+
+
+def journal_key(module_name, params, *options):
+    """
+    Returns the key of the edit_config journal of a resource module run, so
+    that a push is only resumed by a run of the same module towards the same
+    desired state.
+
+    :param module_name: the name of the module
+    :param params: the module parameters
+    :param options: the parameters holding the desired configuration
+    :rtype: A dictionary
+    :returns: the module name and the sha256 hash of its state and configuration
+    """
+    want = dict((option, params.get(option)) for option in ("state",) + options)
+    data = json.dumps(want, sort_keys=True)
+    return {"module": module_name, "want": hashlib.sha256(data.encode("utf-8")).hexdigest()}
+
+
+class PhaseTimer(object):
+    """
+    The time a resource module spends in each phase of its run, returned
+    as the timing of its result for the alcatel.aos8.aos8_profile callback.
+    The phases are facts, diff, push and the write_memory and flash_synchro
+    of the configuration the cliconf plugin reports with edit_config.
+    """
+
+    def __init__(self):
+        self.phases = {}
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, time.time() - start)
+
+    def edit_config(self, connection, candidate=None, **kwargs):
+        """
+        Pushes the candidate with edit_config, timing the push apart from
+        the saving of the configuration timed by the cliconf plugin.
+
+        :rtype: A dictionary
+        :returns: the response of edit_config
+        """
+        start = time.time()
+        resp = connection.edit_config(candidate, **kwargs)
+        seconds = time.time() - start
+        for name, elapsed in iteritems(resp.get("timing") or {}):
+            self.add(name, elapsed)
+            seconds -= elapsed
+        self.add("push", max(seconds, 0.0))
+        return resp
+
+    def to_dict(self):
+        return dict((name, round(seconds, 6)) for name, seconds in iteritems(self.phases))
@@ -45,6 +45,13 @@ options:
         answering a prompt, it is possible to pass a dict containing I(command), I(answer)
         and I(prompt). Common answers are 'y' or "\\r" (carriage return, must be double
         quotes). See examples.
+      - A dict may also contain I(parser), the name of a built-in parser of the output
+        of the command, C(show vlan), C(show vlan members), C(show interfaces status),
+        C(show ip interface), C(show mac-learning) or C(show lldp remote-system). The
+        parsed output is returned in the I(parsed) key, as a list of dicts per command.
+        The outputs of C(show vlan) and C(show vlan members) are parsed as the I(vlans)
+        and I(l2_interfaces) facts gathered by M(alcatel.aos8.aos8_vlans) and
+        M(alcatel.aos8.aos8_l2_interfaces).
     required: true
     type: list
     elements: raw
@@ -55,6 +62,67 @@ options:
       - output
     type: list
     elements: str
+  wait_for:
+    description:
+      - List of conditions to evaluate against the output of the command. The task will
+        wait for each condition to be true before moving forward. If the conditional
+        is not true within the configured number of retries, the task fails. See examples.
+      - The conditions are evaluated after every poll and only the commands whose
+        conditions, referred to by I(result[index]), are not met yet are sent again.
+    aliases:
+      - waitfor
+    type: list
+    elements: str
+  match:
+    description:
+      - The I(match) argument is used in conjunction with the I(wait_for) argument to
+        specify the match policy. Valid values are C(all) or C(any). If the value is
+        set to C(all) then all conditionals in the wait_for must be satisfied. If the
+        value is set to C(any) then only one of the values must be satisfied.
+    default: all
+    choices:
+      - any
+      - all
+    type: str
+  retries:
+    description:
+      - Specifies the number of retries a command should by tried before it is considered
+        failed. The command is run on the target device every retry and evaluated against
+        the I(wait_for) conditions.
+    default: 9
+    type: int
+  interval:
+    description:
+      - Configures the interval in seconds to wait before the first retry of the commands.
+        The interval grows by the I(backoff) factor after every retry, up to 60 seconds,
+        and is randomized by up to half of its value so that the polls of many devices
+        do not hit the network at the same time.
+    default: 1
+    type: int
+  backoff:
+    description:
+      - The factor the I(interval) is multiplied by after every retry. Set it to C(1)
+        to retry at a fixed interval.
+    default: 2.0
+    type: float
+  output_lines:
+    description:
+      - Return the output of the commands split into lines in I(stdout_lines), in
+        addition to I(stdout). Set it to C(false) to halve the size of the result of
+        commands with a large output.
+    default: true
+    type: bool
+  dest:
+    description:
+      - Path of a directory of the controller the output of each command is written to,
+        gzip compressed, in place of being returned in the result. The result then holds
+        in I(stdout_files), for each command, the path of its file, the sha1 checksum and
+        the size of the uncompressed output.
+      - Without I(wait_for), each output is written as soon as it is received from the
+        device and released before the next command is run.
+      - Use a directory per host, for instance with C({{ inventory_hostname }}), as the
+        files are named after the index and the text of the command.
+    type: path
 
 EXAMPLES:
 - name: Run show system on remote devices
@@ -209,25 +277,109 @@ EXAMPLES = r"""
 #}
 
 
+
+
+- name: Return the VLAN memberships as structured data
+  alcatel.aos8.aos8_command:
+    commands:
+      - command: show vlan members
+        parser: show vlan members
+
+# "parsed": [
+#     [
+#         {
+#             "mode": "untagged",
+#             "port_number": "1/1/1",
+#             "port_type": "port",
+#             "vlan_id": 1
+#         }
+#     ]
+# ]
+
+- name: Save large outputs to the controller, gzip compressed
+  alcatel.aos8.aos8_command:
+    commands:
+      - show tech-support
+      - show configuration snapshot
+    dest: "snapshots/{{ inventory_hostname }}"
+
+# "stdout_files": [
+#     {
+#         "checksum": "4f0c5e9e3b2a0a8d5f3b7d1f6c2e8a9b0c1d2e3f",
+#         "command": "show tech-support",
+#         "path": "snapshots/ACSW01/00_show_tech_support.txt.gz",
+#         "size": 1843211
+#     },
+#     ...
+# ]
+
+- name: Wait for the port to be up, polling only the command of the unmet condition
+  alcatel.aos8.aos8_command:
+    commands:
+      - show system
+      - show interfaces 1/1/1 status
+    wait_for:
+      - result[1] contains " up "
+    retries: 6
+    interval: 2
 """
 
+import gzip
+import hashlib
+import os
+import random
+import re
 import time
-from ansible.module_utils._text import to_text
+
+from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.parsing import (
     Conditional,
+    FailedConditionalError,
 )
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
+    EntityCollection,
     to_lines,
-    transform_commands,
 )
 from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.argspec.command.command import (
     CommandArgs,
 )
 
 from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.aos8 import run_commands
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.parsers.parsers import (
+    PARSERS,
+    parse_output,
+)
+
+# The upper bound of the delay between two polls, in seconds
+MAX_INTERVAL = 60
+
+
+def transform_commands(module):
+    transform = EntityCollection(
+        module,
+        dict(
+            command=dict(key=True),
+            output=dict(),
+            prompt=dict(type="list"),
+            answer=dict(type="list"),
+            newline=dict(type="bool", default=True),
+            sendonly=dict(type="bool", default=False),
+            check_all=dict(type="bool", default=False),
+            parser=dict(),
+        ),
+    )
+
+    return transform(module.params["commands"])
+
 
 def parse_commands(module, warnings):
+    """Return the commands to run and, separately, the name of the parser
+    of each of them as the cliconf plugin does not know about parsers.
+
+    :rtype: A tuple
+    :returns: the list of commands and the list of parser names
+    """
     commands = transform_commands(module)
     if module.check_mode:
         for item in list(commands):
@@ -237,7 +389,68 @@ def parse_commands(module, warnings):
                     % item["command"],
                 )
                 commands.remove(item)
-    return commands
+    parsers = [item.pop("parser") for item in commands]
+    for parser in parsers:
+        if parser is not None and parser not in PARSERS:
+            module.fail_json(
+                msg="parser must be one of %s, got %s" % (", ".join(sorted(PARSERS)), parser),
+            )
+    return commands, parsers
+
+
+def conditional_commands(conditionals, count):
+    """Return the indexes of the commands the conditionals are applied to,
+    all of them when a conditional does not refer to a single result.
+
+    :rtype: A list
+    :returns: the sorted indexes of the commands to run
+    """
+    indexes = set()
+    for item in conditionals:
+        match = re.match(r"^result\[(\d+)\]", item.key)
+        if not match:
+            return list(range(count))
+        indexes.add(int(match.group(1)))
+    return sorted(index for index in indexes if index < count)
+
+
+def poll_delay(interval, backoff, attempt):
+    """Return the delay before the next poll, growing exponentially with the
+    attempt up to MAX_INTERVAL, half of it being random so that the polls of
+    many hosts are spread over time.
+
+    :rtype: A float
+    :returns: the delay in seconds
+    """
+    delay = min(interval * backoff ** attempt, MAX_INTERVAL)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def save_output(module, dest, index, command, response):
+    """Write the output of a command gzipped to a file of the dest directory
+
+    :rtype: A dictionary
+    :returns: the command, the path of the file, the sha1 checksum and the
+              size of the uncompressed output
+    """
+    data = to_bytes(response, errors="surrogate_then_replace")
+    name = "%02d_%s.txt.gz" % (index, re.sub(r"[^0-9A-Za-z]+", "_", command).strip("_"))
+    path = os.path.join(dest, name)
+    try:
+        if not os.path.isdir(dest):
+            os.makedirs(dest)
+        with open(path + ".tmp", "wb") as raw:
+            with gzip.GzipFile(name, "wb", fileobj=raw, mtime=0) as compressed:
+                compressed.write(data)
+        os.rename(path + ".tmp", path)
+    except (IOError, OSError) as exc:
+        module.fail_json(msg="unable to write %s: %s" % (path, to_text(exc)))
+    return {
+        "command": command,
+        "path": path,
+        "checksum": hashlib.sha1(data).hexdigest(),
+        "size": len(data),
+    }
 
 
 def main():
@@ -252,12 +465,84 @@ def main():
     ) 
     warnings = list()
     result = {"changed": False, "warnings": warnings}
-    commands = parse_commands(module, warnings)
-    responses = run_commands(module, commands)
+    commands, parsers = parse_commands(module, warnings)
+
+    wait_for = module.params["wait_for"] or list()
+    try:
+        conditionals = [Conditional(c) for c in wait_for]
+    except (AttributeError, ValueError) as exc:
+        module.fail_json(msg=to_text(exc))
+
+    retries = module.params["retries"]
+    interval = module.params["interval"]
+    backoff = module.params["backoff"]
+    match = module.params["match"]
+
+    dest = module.params["dest"]
+    if dest and not conditionals:
+        # Each output is written as soon as it is received and released
+        # before the next command is run
+        responses = (run_commands(module, [command])[0] for command in commands)
+    else:
+        # The first poll runs all the commands, the next ones only the
+        # commands the unmet conditionals are applied to
+        responses = run_commands(module, commands)
+    attempt = 0
+    while conditionals:
+        try:
+            for item in list(conditionals):
+                if item(responses):
+                    if match == "any":
+                        conditionals = list()
+                        break
+                    conditionals.remove(item)
+        except FailedConditionalError as exc:
+            module.fail_json(msg=to_text(exc), failed_conditions=[exc.failed_conditional])
+
+        if not conditionals or attempt >= retries:
+            break
+
+        time.sleep(poll_delay(interval, backoff, attempt))
+        attempt += 1
+
+        indexes = conditional_commands(conditionals, len(commands))
+        for index, response in zip(
+            indexes,
+            run_commands(module, [commands[index] for index in indexes]),
+        ):
+            responses[index] = response
+
+    if conditionals:
+        failed_conditions = [item.raw for item in conditionals]
+        msg = "One or more conditional statements have not been satisfied"
+        module.fail_json(msg=msg, failed_conditions=failed_conditions)
+
+    if any(parsers):
+        result["parsed"] = list()
 
-    module.params["output"] = list(to_lines(responses))
+    if dest:
+        result["stdout_files"] = list()
+        for index, (command, parser, response) in enumerate(zip(commands, parsers, responses)):
+            result["stdout_files"].append(
+                save_output(module, dest, index, command["command"], response),
+            )
+            if parser:
+                result["parsed"].append(parse_output(parser, response))
+            elif "parsed" in result:
+                result["parsed"].append(None)
+        module.exit_json(**result)
 
-    result.update({"stdout": responses, "stdout_lines": list(to_lines(responses))})
+    result["stdout"] = responses
+    if module.params["output_lines"]:
+        # The lines are computed once and shared by the output parameter
+        lines = list(to_lines(responses))
+        module.params["output"] = lines
+        result["stdout_lines"] = lines
+    if "parsed" in result:
+        result["parsed"] = [
+            parse_output(parser, response) if parser else None
+            for parser, response in zip(parsers, responses)
+        ]
     module.exit_json(**result)
 
 if __name__ == "__main__":
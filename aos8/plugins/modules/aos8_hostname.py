@@ -28,6 +28,15 @@ options:
       hostname:
         type: str
         description: The name of the <resource>
+  running_config:
+    description:
+      - This option is used only with state I(parsed).
+      - The value of this option should be the output received from the aos8 device
+        by executing the command B(show configuration snapshot | grep '^system name').
+      - The state I(parsed) reads the configuration from C(running_config) option and
+        transforms it into Ansible structured data as per the resource module's argspec
+        and the value is then returned in the I(parsed) key within the result.
+    type: str
   state:
     description:
     - The state the configuration should be left in
@@ -92,6 +101,14 @@ parsed:
   sample: >
     This output will always be in the same format as the
     module argspec.
+timing:
+  description:
+  - The seconds the module spent in each phase of its run, gathering the facts (facts),
+    computing the commands (diff), pushing them (push) and saving the configuration
+    (write_memory and flash_synchro), as reported to the alcatel.aos8.aos8_profile callback.
+  returned: always
+  type: dict
+  sample: {"facts": 0.31, "diff": 0.002, "push": 0.42, "write_memory": 1.1}
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -0,0 +1,254 @@
+#!/usr/bin/python
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+The module file for aos8_resources
+"""
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+module: aos8_resources
+short_description: Resource module to configure VLANs and VLAN membership together on AOS8 devices
+description:
+  - This module provides declarative management of VLANs and VLAN membership on
+    Alcatel AOS8 network devices in a single task.
+  - The current configuration of both resources is fetched once, the changes are
+    computed with the aos8_vlans and aos8_l2_interfaces logic and pushed as one
+    dependency ordered command set, which is saved once.
+  - VLANs are created and configured first, then the VLAN membership is changed,
+    and VLANs are deleted last.
+version_added: 1.0.0
+author: Samuel Yip Kah Yean (@samuelyip74)
+notes:
+  - Tested against Alcatel-Lucent AOS8 OmniSwitch with Version 8.9.221.R03 GA.
+  - This module works with connection C(network_cli).
+  - A resource which is not provided is left untouched, whatever the I(state).
+options:
+  vlans:
+    description:
+      - The VLANs configuration, as in the I(config) option of aos8_vlans.
+      - With I(state=deleted), an empty list deletes all the VLANs.
+    type: list
+    elements: dict
+    suboptions:
+      name:
+        description:
+          - Ascii name of the VLAN.
+          - NOTE, I(name) should not be named/appended with I(default) as it is reserved
+            for device default vlans.
+        type: str
+      vlan_id:
+        description:
+          - ID of the VLAN. Range 1-4094
+        type: int
+        required: true
+      mtu:
+        description:
+          - VLAN Maximum Transmission Unit.
+          - Refer to vendor documentation for valid values.
+          - When not set, the MTU of an existing VLAN is left as is and a new VLAN gets
+            the device default 1500.
+        type: int
+      admin:
+        description:
+          - Administration state of the VLAN
+          - When not set, the state of an existing VLAN is left as is and a new VLAN is
+            enabled.
+        type: str
+        choices:
+          - enable
+          - disable
+      operational_state:
+        description:
+          - Operational state of the VLAN, only returned by the device.
+        type: str
+        choices:
+          - enable
+          - disable
+  l2_interfaces:
+    description:
+      - The VLAN membership configuration, as in the I(config) option of aos8_l2_interfaces.
+      - With I(state=deleted), an empty list deletes all the VLAN memberships.
+    type: list
+    elements: dict
+    suboptions:
+      vlan_id:
+        description:
+          - ID of the VLAN. Range 1-4094
+        type: int
+        required: true
+      port_type:
+        description:
+          - The type of L2 interface
+        type: str
+        required: true
+        choices:
+          - port
+          - linkagg
+      port_number:
+        description:
+          - The physical port number of logical linkagg number
+        type: str
+        required: true
+      mode:
+        description:
+          - The type of encapsulation (802.1q or clear)
+        type: str
+        required: true
+        choices:
+          - untagged
+          - tagged
+  resume:
+    description:
+      - Continue the configuration push to the device interrupted on a previous run,
+        for instance by a SSH disconnection, from the last command acknowledged by
+        the device, without collecting the facts and computing the changes again.
+      - The push is recorded on the controller by the cliconf plugin, see its
+        I(journal_dir) option. Only a push of the same module with the same I(state) and
+        configuration is resumed, otherwise the module runs as usual.
+      - The command which was in flight when the push was interrupted is sent again.
+        Only the errors showing it was already applied, such as a VLAN it removes not
+        existing anymore, are ignored.
+    type: bool
+    default: false
+  state:
+    description:
+      - The state the configuration should be left in, applied to every provided resource.
+      - The states I(rendered) and I(gathered) does not perform any change on the device.
+    type: str
+    choices:
+      - merged
+      - replaced
+      - overridden
+      - deleted
+      - rendered
+      - gathered
+    default: merged
+"""
+
+EXAMPLES = """
+# Using merged
+
+- name: Create VLANs and add ports to them in a single change
+  alcatel.aos8.aos8_resources:
+    vlans:
+      - vlan_id: 33
+        name: "Vlan 33"
+      - vlan_id: 34
+        name: "Vlan 34"
+    l2_interfaces:
+      - vlan_id: 33
+        port_type: port
+        port_number: 1/1/1
+        mode: untagged
+      - vlan_id: 34
+        port_type: port
+        port_number: 1/1/1
+        mode: tagged
+    state: merged
+
+# "commands": [
+#     "vlan 33-34",
+#     "vlan 33 name \\"Vlan 33\\"",
+#     "vlan 34 name \\"Vlan 34\\"",
+#     "vlan 33 members port 1/1/1 untagged",
+#     "vlan 34 members port 1/1/1 tagged"
+# ]
+
+# Using overridden
+
+- name: Override the VLANs and the VLAN membership of the device
+  alcatel.aos8.aos8_resources:
+    vlans:
+      - vlan_id: 1
+        name: MGNT
+      - vlan_id: 33
+        name: "Vlan 33"
+    l2_interfaces:
+      - vlan_id: 33
+        port_type: port
+        port_number: 1/1/1
+        mode: untagged
+    state: overridden
+"""
+
+RETURN = """
+before:
+  description: The configuration of every resource as structured data prior to module invocation.
+  returned: always
+  type: dict
+  sample: >
+    The configuration returned will always be in the same format
+     of the parameters above, keyed by resource.
+after:
+  description: The configuration of every resource as structured data after module completion.
+  returned: when changed
+  type: dict
+  sample: >
+    The configuration returned will always be in the same format
+     of the parameters above, keyed by resource.
+commands:
+  description: The set of commands pushed to the remote device.
+  returned: always
+  type: list
+  sample: ['vlan 20', 'vlan 20 name "vlan_20"', 'vlan 20 members port 1/1/1 tagged']
+timing:
+  description:
+  - The seconds the module spent in each phase of its run, gathering the facts (facts),
+    computing the commands (diff), pushing them (push) and saving the configuration
+    (write_memory and flash_synchro), as reported to the alcatel.aos8.aos8_profile callback.
+  returned: always
+  type: dict
+  sample: {"facts": 0.31, "diff": 0.002, "push": 0.42, "write_memory": 1.1}
+"""
+from ansible.module_utils.basic import AnsibleModule
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.argspec.resources.resources import (
+    ResourcesArgs,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.config.resources.resources import (
+    Resources,
+)
+
+
+def main():
+    """
+    Main entry point for module execution
+
+    :returns: the result form module invocation
+    """
+    required_if = [
+        ("state", "merged", ("vlans", "l2_interfaces"), True),
+        ("state", "replaced", ("vlans", "l2_interfaces"), True),
+        ("state", "overridden", ("vlans", "l2_interfaces"), True),
+        ("state", "rendered", ("vlans", "l2_interfaces"), True),
+    ]
+
+    module = AnsibleModule(
+        argument_spec=ResourcesArgs.argument_spec,
+        required_if=required_if,
+        supports_check_mode=True,
+    )
+
+    result = Resources(module).execute_module()
+    module.exit_json(**result)
+
+if __name__ == "__main__":
+    main()
@@ -55,10 +55,14 @@ options:
         description:
           - VLAN Maximum Transmission Unit.
           - Refer to vendor documentation for valid values.
+          - When not set, the MTU of an existing VLAN is left as is and a new VLAN gets
+            the device default 1500.
         type: int
       admin:
         description:
           - Administration state of the VLAN
+          - When not set, the state of an existing VLAN is left as is and a new VLAN is
+            enabled.
         type: str
         choices:
           - enable
@@ -72,6 +76,32 @@ options:
         transforms it into Ansible structured data as per the resource module's argspec
         and the value is then returned in the I(parsed) key within the result.
     type: str
+  offline_source:
+    description:
+      - Path on the controller to a stored snapshot of the device, the output of
+        the command B(show vlan) captured from it. The current configuration is read from
+        this file in place of the device, so no connection is opened and the task
+        may use the C(local) connection.
+      - The same file may hold the output of both B(show vlan) and B(show vlan members),
+        each module parsing only its own lines.
+      - With the states I(merged), I(replaced), I(overridden) and I(deleted) it can only
+        be used in check mode, to compute the commands and the diff. With the state
+        I(rendered) the commands are computed against the snapshot, with the state
+        I(gathered) the snapshot is returned as structured data.
+    type: path
+  resume:
+    description:
+      - Continue the configuration push to the device interrupted on a previous run,
+        for instance by a SSH disconnection, from the last command acknowledged by
+        the device, without collecting the facts and computing the changes again.
+      - The push is recorded on the controller by the cliconf plugin, see its
+        I(journal_dir) option. Only a push of the same module with the same I(state) and
+        configuration is resumed, otherwise the module runs as usual.
+      - The command which was in flight when the push was interrupted is sent again.
+        Only the errors showing it was already applied, such as a VLAN it removes not
+        existing anymore, are ignored.
+    type: bool
+    default: false
   state:
     description:
       - The state the configuration should be left in
@@ -547,6 +577,29 @@ EXAMPLES = """
 # }
 
 
+# Using offline_source
+
+# snapshots/acsw01.txt holds the output of "show vlan" captured from the device
+#  vlan    type   admin   oper    ip    mtu          name
+# ------+-------+-------+------+------+------+------------------
+# 1      std       Ena     Ena   Ena    1500    MGNT
+
+- name: Compute the changes against the snapshot, without connecting to the device
+  alcatel.aos8.aos8_vlans:
+    config:
+      - vlan_id: 33
+        name: "Vlan_33"
+    offline_source: snapshots/acsw01.txt
+    state: merged
+  check_mode: true
+
+#  "changed": true,
+#  "commands": [
+#      "vlan 33",
+#      "vlan 33 name \"Vlan_33\""
+#  ],
+
+
 """
 
 RETURN = """
@@ -569,6 +622,14 @@ commands:
   returned: always
   type: list
   sample: ['vlan 20', 'vlan 20 name vlan_20']
+timing:
+  description:
+  - The seconds the module spent in each phase of its run, gathering the facts (facts),
+    computing the commands (diff), pushing them (push) and saving the configuration
+    (write_memory and flash_synchro), as reported to the alcatel.aos8.aos8_profile callback.
+  returned: always
+  type: dict
+  sample: {"facts": 0.31, "diff": 0.002, "push": 0.42, "write_memory": 1.1}
 """
 from ansible.module_utils.basic import AnsibleModule
 
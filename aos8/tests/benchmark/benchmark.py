@@ -0,0 +1,488 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+The micro-benchmarks of the AOS8 parsers and state functions
+The show outputs and the snapshot are generated by a simulated switch of
+the given size, then the facts parsers, the hostname template, a template
+of many parsers with the AOS8 and the netcommon base classes, dict_to_set
+and the records replacing it, the VlanSet operations, the interned ports,
+the membership matrix, the command compression and the state functions
+of the vlans and l2_interfaces resources are timed on them. Each
+benchmark reports its best time, its throughput in input lines and output
+records per second and its peak memory. The results are stored as JSON,
+and compared with the results of a previous run:
+
+    python -m ansible_collections.alcatel.aos8.tests.benchmark.benchmark \\
+        --chassis 8 --vlans 4094 --tagged 100 --output after.json --baseline before.json
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import argparse
+import gc
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.network_template import (
+    NetworkTemplate,
+)
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.config.l2_interfaces.l2_interfaces import (
+    L2_interfaces,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.config.vlans.vlans import (
+    Vlans,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.facts.l2_interfaces.l2_interfaces import (
+    L2_interfacesFacts,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.facts.vlans.vlans import (
+    VlansFacts,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.rm_base.network_template import (
+    Aos8NetworkTemplate,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.rm_templates.hostname import (
+    HostnameTemplate,
+)
+from ansible_collections.alcatel.aos8.tests.simulator.device import (
+    Device,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import (
+    MembershipMatrix,
+    VlanSet,
+    compact_ports,
+    compress_port_commands,
+    compress_vlan_commands,
+    dict_to_set,
+    diff_records,
+    expand_ports,
+    parse_port,
+    to_member_record,
+    to_vlan_record,
+)
+
+
+STATES = ("merged", "replaced", "overridden", "deleted")
+
+# The top-level keywords of the AOS8 configuration the synthetic template
+# parsers are spread on, next to the vlan parsers of the snapshot lines
+KEYWORDS = (
+    "aaa", "interfaces", "ip", "ipv6", "lacp", "linkagg", "lldp", "mac-learning",
+    "ntp", "qos", "session", "snmp", "spantree", "system", "user",
+)
+VLAN_PARSERS = (
+    ("vlan_admin", r"^vlan (?P<vlan_id>\d+) admin-state (?P<admin>\S+)$", {"admin": "{{ admin }}"}),
+    ("vlan_name", r"^vlan (?P<vlan_id>\d+) name \"(?P<name>[^\"]*)\"$", {"name": "{{ name }}"}),
+    ("vlan_mtu", r"^vlan (?P<vlan_id>\d+) mtu-ip (?P<mtu>\d+)$", {"mtu": "{{ mtu }}"}),
+    (
+        "vlan_members",
+        r"^vlan (?P<vlan_id>\d+) members port (?P<port>\S+) (?P<mode>\S+)$",
+        {"members": {"{{ port }}": "{{ mode }}"}},
+    ),
+)
+
+
+class BenchmarkModule(object):
+    """The module the config classes are run with, the facts are given
+    to set_config so no connection is opened, as with offline_source
+    """
+
+    check_mode = True
+
+    def __init__(self, state, config):
+        self.params = {"state": state, "config": config, "offline_source": "benchmark"}
+
+    def fail_json(self, **kwargs):
+        raise RuntimeError(kwargs.get("msg"))
+
+
+def _facts(facts_class, resource, data):
+    facts = facts_class(None).populate_facts(None, {"ansible_network_resources": {}}, data=data)
+    return facts["ansible_network_resources"].get(resource, [])
+
+
+def template_parsers(count):
+    """The parsers of a resource module template spread on the AOS8
+    keywords, ordered by keyword as the parsers of a template grouped by
+    feature, with the vlan parsers of the snapshot lines among them
+
+    :param count: the number of parsers, at least the vlan parsers
+    :rtype: A tuple
+    :returns: the parsers and a config line matched by each synthetic one
+    """
+    parsers = []
+    lines = []
+    for index in range(count - len(VLAN_PARSERS)):
+        keyword = KEYWORDS[index % len(KEYWORDS)]
+        option = "option{0}".format(index)
+        parsers.append(
+            {
+                "name": "{0}_{1}".format(keyword, option),
+                "getval": r"^{0} {1} (?P<value>\S+)$".format(re.escape(keyword), option),
+                "setval": "{0} {1} {{{{ value }}}}".format(keyword, option),
+                "result": {keyword: {option: "{{ value }}"}},
+            },
+        )
+        lines.append("{0} {1} {2}".format(keyword, option, index))
+    for name, getval, result in VLAN_PARSERS:
+        parsers.append(
+            {
+                "name": name,
+                "getval": getval,
+                "result": {"vlans": {"{{ vlan_id }}": result}},
+            },
+        )
+    parsers.sort(key=lambda parser: parser["name"].split("_")[0])
+    return parsers, lines
+
+
+def template_classes(parsers):
+    """The template classes of the parsers, with the AOS8 and the
+    netcommon base classes
+    """
+    classes = []
+    for base in (Aos8NetworkTemplate, NetworkTemplate):
+
+        def __init__(self, lines=None, module=None, base=base):
+            base.__init__(self, lines=lines, tmplt=self, module=module)
+
+        classes.append(type("Benchmark" + base.__name__, (base,), {"PARSERS": parsers, "__init__": __init__}))
+    return classes
+
+
+def _lines(data):
+    return data.count("\n") + 1
+
+
+def generate(chassis=1, slots=1, ports=48, vlans=4094, tagged=100, parsers=90, template_lines=1000):
+    """Generate the inputs of the benchmarks with a simulated switch
+
+    :param vlans: the number of VLANs of the switch
+    :param tagged: the number of VLANs every port is tagged in
+    :param parsers: the number of parsers of the benchmarked template
+    :param template_lines: the number of lines the template parses
+    :rtype: A dictionary
+    :returns: the show outputs, the snapshot, the facts and the desired
+              configurations of the benchmarks
+    """
+    device = Device(chassis=chassis, slots=slots, ports=ports)
+    device.populate(vlans="1-{0}".format(vlans), tagged="2-{0}".format(tagged + 1) if tagged else None)
+    for vlan_id in range(2, vlans + 1, 7):
+        device.run('vlan {0} name "Vlan {0}"'.format(vlan_id))
+
+    inputs = {
+        "show vlan": device.run("show vlan"),
+        "show vlan members": device.run("show vlan members"),
+        "show system": device.run("show system"),
+        "snapshot": "\n".join(device.snapshot(compress=False)),
+    }
+    # The template parses lines taken evenly from the snapshot and as many
+    # lines of the synthetic parsers. The netcommon NetworkTemplate merges
+    # each line into a copy of the whole result, so its time grows with the
+    # square of the lines and the template cases have their own size.
+    inputs["parsers"], lines = template_parsers(parsers)
+    lines = inputs["snapshot"].splitlines() + lines * (inputs["snapshot"].count("\n") // max(len(lines), 1))
+    inputs["template lines"] = lines[:: max(len(lines) // template_lines, 1)][:template_lines]
+    inputs["vlans"] = _facts(VlansFacts, "vlans", inputs["show vlan"])
+    inputs["l2_interfaces"] = _facts(L2_interfacesFacts, "l2_interfaces", inputs["show vlan members"])
+
+    # The desired VLANs rename one VLAN out of two and drop the last tenth,
+    # the desired memberships move the tagged VLANs of one port out of two
+    want = []
+    for index, vlan in enumerate(inputs["vlans"][: len(inputs["vlans"]) * 9 // 10]):
+        vlan = dict(vlan)
+        if index % 2:
+            vlan["name"] = "Renamed {0}".format(vlan["vlan_id"])
+        want.append(vlan)
+    inputs["want vlans"] = want
+    want = []
+    for index, member in enumerate(inputs["l2_interfaces"]):
+        member = dict(member)
+        if member["mode"] == "tagged" and index % 2:
+            member["vlan_id"] = min(member["vlan_id"] + tagged, vlans)
+        want.append(member)
+    inputs["want l2_interfaces"] = want
+    return inputs
+
+
+def benchmarks(inputs):
+    """The benchmarks, as (name, function, input lines), the function
+    returns its output records
+    """
+    hostname_lines = inputs["snapshot"].splitlines()
+    template_lines = inputs["template lines"]
+    aos8_template, netcommon_template = template_classes(inputs["parsers"])
+    want_vlan_ids = [int(each["vlan_id"]) for each in inputs["want vlans"]]
+    have_vlan_ids = [int(each["vlan_id"]) for each in inputs["vlans"]]
+    vlan_commands = ["vlan {0} admin-state enable".format(vlan_id) for vlan_id in have_vlan_ids]
+    port_numbers = [each["port_number"] for each in inputs["l2_interfaces"]]
+    member_records = [to_member_record(each) for each in inputs["l2_interfaces"]]
+    vlan_ports = {}
+    for each in member_records:
+        vlan_ports.setdefault(each.vlan_id, []).append(each.port_number)
+    port_ranges = [port_range for ports in vlan_ports.values() for port_range in compact_ports(ports)]
+    have_vlans = [to_vlan_record(each) for each in inputs["vlans"]]
+    want_vlans = [to_vlan_record(each) for each in inputs["want vlans"]]
+    want_members = [to_member_record(each) for each in inputs["want l2_interfaces"]]
+    port_commands = [
+        "vlan {0} members port {1} {2}".format(each.vlan_id, each.port_number, each.mode)
+        for each in member_records
+        if each.port_type == "port"
+    ]
+
+    def vlan_set():
+        want = VlanSet(want_vlan_ids)
+        have = VlanSet(have_vlan_ids)
+        return list(have - want) + list(have & want) + list(want - have)
+
+    def state_function(config_class, resource, state):
+        want = inputs["want " + resource]
+        have = inputs[resource]
+        if state == "deleted":
+            want = want[: len(want) // 2]
+
+        def run():
+            return config_class(BenchmarkModule(state, want)).set_config(have)
+
+        return run
+
+    yield (
+        "parse_vlan",
+        lambda: VlansFacts(None).parse_vlan(inputs["show vlan"]),
+        _lines(inputs["show vlan"]),
+    )
+    yield (
+        "parse_l2_interfaces",
+        lambda: L2_interfacesFacts(None).parse_l2_interfaces(inputs["show vlan members"]),
+        _lines(inputs["show vlan members"]),
+    )
+    yield (
+        "hostname_template_parse",
+        lambda: [HostnameTemplate(lines=hostname_lines).parse()],
+        len(hostname_lines),
+    )
+    yield (
+        "template_parse",
+        lambda: aos8_template(lines=template_lines).parse()["vlans"],
+        len(template_lines),
+    )
+    yield (
+        "netcommon_template_parse",
+        lambda: netcommon_template(lines=template_lines).parse()["vlans"],
+        len(template_lines),
+    )
+    yield (
+        "dict_to_set",
+        lambda: [dict_to_set(dict(each)) for each in inputs["l2_interfaces"]],
+        len(inputs["l2_interfaces"]),
+    )
+    yield (
+        "to_member_record",
+        lambda: [to_member_record(each) for each in inputs["l2_interfaces"]],
+        len(inputs["l2_interfaces"]),
+    )
+    yield (
+        "to_vlan_record",
+        lambda: [to_vlan_record(each) for each in inputs["vlans"]],
+        len(inputs["vlans"]),
+    )
+    yield (
+        "diff_records",
+        lambda: [diff_records(want, have) for want, have in zip(want_vlans, have_vlans)],
+        len(want_vlans),
+    )
+    yield (
+        "member_record_difference",
+        lambda: list(set(member_records) - set(want_members)),
+        len(member_records) + len(want_members),
+    )
+    yield (
+        "vlan_set",
+        vlan_set,
+        len(want_vlan_ids) + len(have_vlan_ids),
+    )
+    yield (
+        "vlan_set_range",
+        lambda: list(VlanSet.from_range(VlanSet(have_vlan_ids).to_range()).range_strings()),
+        len(have_vlan_ids),
+    )
+    yield (
+        "compress_vlan_commands",
+        lambda: compress_vlan_commands(vlan_commands),
+        len(vlan_commands),
+    )
+    yield (
+        "parse_port",
+        lambda: [parse_port(each) for each in port_numbers],
+        len(port_numbers),
+    )
+    yield (
+        "expand_ports",
+        lambda: [port for each in port_ranges for port in expand_ports(each)],
+        len(port_ranges),
+    )
+    yield (
+        "membership_matrix",
+        lambda: MembershipMatrix.from_records(member_records).ports,
+        len(member_records),
+    )
+    yield (
+        "compress_port_commands",
+        lambda: compress_port_commands(port_commands),
+        len(port_commands),
+    )
+    for state in STATES:
+        yield (
+            "vlans_" + state,
+            state_function(Vlans, "vlans", state),
+            len(inputs["vlans"]),
+        )
+    for state in STATES:
+        yield (
+            "l2_interfaces_" + state,
+            state_function(L2_interfaces, "l2_interfaces", state),
+            len(inputs["l2_interfaces"]),
+        )
+
+
+def measure(function, lines, repeat=5):
+    """Time a benchmark, then trace its memory in one more run
+
+    :rtype: A dictionary
+    :returns: the best time, the throughputs and the peak memory
+    """
+    best = None
+    records = 0
+    for _index in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        records = len(function())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": round(best, 6),
+        "lines": lines,
+        "records": records,
+        "lines_per_second": round(lines / best) if best else None,
+        "records_per_second": round(records / best) if best else None,
+        "peak_memory": peak,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Compare the results with the baseline ones
+
+    :rtype: A list
+    :returns: the (name, ratio) of the benchmarks slower than the baseline
+              by more than the threshold, 0.2 meaning 20%
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or not before["seconds"]:
+            continue
+        ratio = result["seconds"] / before["seconds"]
+        result["baseline_ratio"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the AOS8 parsers and state functions")
+    parser.add_argument("--chassis", type=int, default=8)
+    parser.add_argument("--slots", type=int, default=1)
+    parser.add_argument("--ports", type=int, default=48, help="the number of ports of a slot")
+    parser.add_argument("--vlans", type=int, default=4094, help="the number of VLANs")
+    parser.add_argument("--tagged", type=int, default=100, help="the VLANs tagged on every port")
+    parser.add_argument("--parsers", type=int, default=90, help="the parsers of the benchmarked template")
+    parser.add_argument("--template-lines", type=int, default=1000, help="the lines the template parses")
+    parser.add_argument("--repeat", type=int, default=5, help="the runs of each benchmark")
+    parser.add_argument("--filter", help="only run the benchmarks whose name contains it")
+    parser.add_argument("--output", help="the JSON file the results are stored in")
+    parser.add_argument("--baseline", help="the JSON file of the results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="the slowdown over the baseline reported as a regression, 0.2 for 20%%",
+    )
+    args = parser.parse_args(argv)
+
+    scale = {
+        "chassis": args.chassis,
+        "slots": args.slots,
+        "ports": args.ports,
+        "vlans": args.vlans,
+        "tagged": args.tagged,
+        "parsers": args.parsers,
+        "template_lines": args.template_lines,
+    }
+    inputs = generate(**scale)
+
+    results = {}
+    row = "{0:<26}{1:>11}{2:>10}{3:>10}{4:>14}{5:>14}{6:>12}"
+    print(row.format("benchmark", "seconds", "lines", "records", "lines/s", "records/s", "peak KiB"))
+    for name, function, lines in benchmarks(inputs):
+        if args.filter and args.filter not in name:
+            continue
+        result = results[name] = measure(function, lines, args.repeat)
+        print(
+            row.format(
+                name,
+                "{0:.4f}".format(result["seconds"]),
+                result["lines"],
+                result["records"],
+                result["lines_per_second"],
+                result["records_per_second"],
+                result["peak_memory"] // 1024,
+            ),
+        )
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as fhand:
+            baseline = json.load(fhand)
+        if baseline.get("scale") != scale:
+            sys.stderr.write("the baseline was run at another scale: {0}\n".format(baseline.get("scale")))
+        regressions = compare(results, baseline["results"], args.threshold)
+        for name, ratio in regressions:
+            print("REGRESSION {0}: {1:.2f}x the baseline time".format(name, ratio))
+
+    if args.output:
+        with open(args.output, "w") as fhand:
+            json.dump(
+                {
+                    "scale": scale,
+                    "python": platform.python_version(),
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "results": results,
+                },
+                fhand,
+                indent=2,
+                sort_keys=True,
+            )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
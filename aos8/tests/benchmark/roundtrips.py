@@ -0,0 +1,336 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+The round trip accounting of the AOS8 resource modules
+Each resource module is run, for each state, against a simulated switch
+through the cliconf plugin of the collection, in place of the persistent
+connection. The harness counts the RPCs the module makes to the connection
+and the commands the cliconf plugin sends to the switch, the bytes they
+move and the time they take. The counts are deterministic, so they are
+stored as a baseline and a run fails when a scenario makes more round trips
+or RPCs than in the baseline:
+
+    python -m ansible_collections.alcatel.aos8.tests.benchmark.roundtrips \\
+        --baseline playbooks/benchmark/aos8_roundtrips.json
+
+The estimated time adds the given latency to each command, as a WAN link
+to the switch would.
+
+The baseline is regenerated with --output only for an intentional change of
+the protocol of a module, such as a new command or RPC it requires, and the
+commit updating it gives the reason of each count it raises. A change which
+makes more round trips by accident is fixed instead.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import argparse
+import json
+import sys
+import time
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.connection import ConnectionError
+
+from ansible_collections.alcatel.aos8.plugins.cliconf.aos8 import Cliconf
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.argspec.hostname.hostname import (
+    HostnameArgs,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.argspec.l2_interfaces.l2_interfaces import (
+    L2_interfacesArgs,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.argspec.resources.resources import (
+    ResourcesArgs,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.argspec.vlans.vlans import (
+    VlansArgs,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.config.hostname.hostname import (
+    Hostname,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.config.l2_interfaces.l2_interfaces import (
+    L2_interfaces,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.config.resources.resources import (
+    Resources,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.config.vlans.vlans import (
+    Vlans,
+)
+from ansible_collections.alcatel.aos8.tests.simulator.device import (
+    Device,
+)
+from ansible_collections.alcatel.aos8.plugins.terminal.aos8 import TerminalModule
+
+
+STATES = ("merged", "replaced", "overridden", "deleted", "gathered")
+
+# The resource modules, as their config class and argument spec
+MODULES = (
+    ("aos8_vlans", Vlans, VlansArgs.argument_spec),
+    ("aos8_l2_interfaces", L2_interfaces, L2_interfacesArgs.argument_spec),
+    ("aos8_hostname", Hostname, HostnameArgs.argument_spec),
+    ("aos8_resources", Resources, ResourcesArgs.argument_spec),
+)
+
+# The counters compared with the baseline
+ROUND_TRIPS = ("commands", "rpcs")
+
+
+class SimulatedCliconf(Cliconf):
+    """The cliconf plugin of the collection, sending its commands to a
+    simulated switch instead of the SSH session of network_cli
+
+    :param device: the simulated switch
+    :param options: the options of the plugin, such as write_memory_flag
+    """
+
+    def __init__(self, device, options=None):
+        self._device_info = {}
+        self._last_rollback = []
+        self._options = dict({"write_memory_flag": True, "journal_dir": ""}, **(options or {}))
+        self.device = device
+        self.stats = {"commands": 0, "command_bytes": 0, "command_seconds": 0.0}
+
+    def get_option(self, option):
+        return self._options.get(option)
+
+    def send_command(self, command=None, prompt=None, answer=None, sendonly=False, newline=True,
+                     prompt_retry_check=False, check_all=False):
+        start = time.perf_counter()
+        output = self.device.run(command)
+        self.stats["commands"] += 1
+        self.stats["command_bytes"] += len(command) + len(output)
+        self.stats["command_seconds"] += time.perf_counter() - start
+        # the errors the terminal plugin raises on
+        for regex in TerminalModule.terminal_stderr_re:
+            if regex.search(to_bytes(output)):
+                raise AnsibleConnectionFailure(output)
+        return output
+
+
+class RecordingConnection(object):
+    """The connection of the module to the cliconf plugin, counting the
+    RPCs and the bytes of their JSON requests and responses as the
+    persistent connection would exchange them
+    """
+
+    def __init__(self, cliconf):
+        self._cliconf = cliconf
+        self.stats = {"rpcs": 0, "rpc_bytes": 0, "methods": {}}
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        method = getattr(self._cliconf, name)
+
+        def rpc(*args, **kwargs):
+            self.stats["rpcs"] += 1
+            self.stats["methods"][name] = self.stats["methods"].get(name, 0) + 1
+            request = {"jsonrpc": "2.0", "method": name, "params": (args, kwargs), "id": 1}
+            self.stats["rpc_bytes"] += len(json.dumps(request))
+            try:
+                response = method(*args, **kwargs)
+            except (AnsibleConnectionFailure, ValueError) as exc:
+                raise ConnectionError(to_text(exc), code=1)
+            self.stats["rpc_bytes"] += len(json.dumps({"jsonrpc": "2.0", "result": response, "id": 1}))
+            return response
+
+        return rpc
+
+
+def make_module(argument_spec, params):
+    """An AnsibleModule of the given parameters, as the module would
+    build it from the arguments of the task"""
+    basic._ANSIBLE_ARGS = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": params}))
+    try:
+        return basic.AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    finally:
+        basic._ANSIBLE_ARGS = None
+
+
+def _tagged(port, vlan_id):
+    return {"vlan_id": vlan_id, "port_type": "port", "port_number": port, "mode": "tagged"}
+
+
+def scenarios(vlans=100, tagged=10, changes=10, ports=48):
+    """The configuration of each module and state, against a switch of the
+    given ports with the VLANs 1 to vlans and every port tagged in the VLANs
+    2 to tagged + 1
+
+    :param changes: the number of VLANs and ports each scenario changes
+    :rtype: A dictionary
+    :returns: the parameters of the module keyed by (module, state)
+    """
+    names = ["1/1/{0}".format(number) for number in range(1, ports + 1)]
+    changed = names[:changes]
+    new_vlan = tagged + 2
+
+    vlan_config = [{"vlan_id": vlan_id, "name": "Renamed {0}".format(vlan_id)} for vlan_id in range(2, changes + 2)]
+    vlan_config += [{"vlan_id": vlan_id} for vlan_id in range(vlans + 1, vlans + changes + 1)]
+    vlan_overridden = [{"vlan_id": 1}] + [{"vlan_id": vlan_id} for vlan_id in range(2, vlans - changes + 1)]
+    vlan_deleted = [{"vlan_id": vlan_id} for vlan_id in range(vlans - changes + 1, vlans + 1)]
+
+    member_merged = [_tagged(port, new_vlan) for port in changed]
+    # the changed ports leave VLAN 2 and join the new VLAN, the others keep
+    # their memberships
+    member_replaced = []
+    for port in changed:
+        member_replaced.append({"vlan_id": 1, "port_type": "port", "port_number": port, "mode": "untagged"})
+        member_replaced.extend(_tagged(port, vlan_id) for vlan_id in range(3, new_vlan + 1))
+    member_overridden = list(member_replaced)
+    for port in names[changes:]:
+        member_overridden.append({"vlan_id": 1, "port_type": "port", "port_number": port, "mode": "untagged"})
+        member_overridden.extend(_tagged(port, vlan_id) for vlan_id in range(2, new_vlan))
+    member_deleted = [_tagged(port, 2) for port in changed]
+
+    configs = {
+        "aos8_vlans": {
+            "merged": vlan_config,
+            "replaced": vlan_config,
+            "overridden": vlan_overridden,
+            "deleted": vlan_deleted,
+        },
+        "aos8_l2_interfaces": {
+            "merged": member_merged,
+            "replaced": member_replaced,
+            "overridden": member_overridden,
+            "deleted": member_deleted,
+        },
+    }
+
+    result = {}
+    for name, _config_class, argument_spec in MODULES:
+        for state in STATES:
+            if state not in argument_spec["state"]["choices"]:
+                continue
+            params = {"state": state}
+            if name == "aos8_hostname":
+                if state != "gathered":
+                    params["config"] = {"hostname": "aos8-renamed"}
+            elif name == "aos8_resources":
+                if state != "gathered":
+                    params["vlans"] = configs["aos8_vlans"][state]
+                    params["l2_interfaces"] = configs["aos8_l2_interfaces"][state]
+            elif state != "gathered":
+                params["config"] = configs[name][state]
+            result[(name, state)] = params
+    return result
+
+
+def account(config_class, argument_spec, params, scale, options=None):
+    """Run a module on a new simulated switch
+
+    :rtype: A dictionary
+    :returns: the counts of the run, with the changed flag of the module
+    """
+    device = Device(chassis=1, slots=1, ports=scale["ports"])
+    device.populate(vlans="1-{0}".format(scale["vlans"]), tagged="2-{0}".format(scale["tagged"] + 1))
+    cliconf = SimulatedCliconf(device, options)
+    connection = RecordingConnection(cliconf)
+
+    module = make_module(argument_spec, params)
+    # the connection the netcommon and aos8 module_utils look up first
+    module._connection = connection
+    module._ios_connection = connection
+
+    start = time.perf_counter()
+    result = config_class(module).execute_module()
+    seconds = time.perf_counter() - start
+
+    return {
+        "changed": result.get("changed", False),
+        "commands": cliconf.stats["commands"],
+        "rpcs": connection.stats["rpcs"],
+        "rpc_methods": connection.stats["methods"],
+        "command_bytes": cliconf.stats["command_bytes"],
+        "rpc_bytes": connection.stats["rpc_bytes"],
+        "seconds": round(seconds, 6),
+    }
+
+
+def compare(results, baseline):
+    """Compare the round trips with the baseline ones
+
+    :rtype: A list
+    :returns: the (scenario, counter, baseline count, count) of the round
+              trips increased since the baseline
+    """
+    increases = []
+    for scenario, result in sorted(results.items()):
+        before = baseline.get(scenario)
+        if not before:
+            continue
+        for counter in ROUND_TRIPS:
+            if result[counter] > before[counter]:
+                increases.append((scenario, counter, before[counter], result[counter]))
+    return increases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count the round trips of the AOS8 resource modules")
+    parser.add_argument("--ports", type=int, default=48, help="the number of ports of the switch")
+    parser.add_argument("--vlans", type=int, default=100, help="the number of VLANs of the switch")
+    parser.add_argument("--tagged", type=int, default=10, help="the VLANs tagged on every port")
+    parser.add_argument("--changes", type=int, default=10, help="the VLANs and ports each scenario changes")
+    parser.add_argument("--latency", type=float, default=0.05, help="the seconds added to each command")
+    parser.add_argument("--write-memory", choices=("true", "false"), default="true")
+    parser.add_argument("--filter", help="only run the scenarios whose name contains it")
+    parser.add_argument("--output", help="the JSON file the counts are stored in")
+    parser.add_argument("--baseline", help="the JSON file of the counts to compare with")
+    args = parser.parse_args(argv)
+
+    scale = {"ports": args.ports, "vlans": args.vlans, "tagged": args.tagged, "changes": args.changes}
+    options = {"write_memory_flag": args.write_memory == "true"}
+    config_classes = dict((name, (config_class, spec)) for name, config_class, spec in MODULES)
+
+    results = {}
+    row = "{0:<32}{1:>9}{2:>7}{3:>13}{4:>11}{5:>10}{6:>12}"
+    print(row.format("scenario", "commands", "rpcs", "cmd bytes", "rpc bytes", "seconds", "estimated"))
+    for (name, state), params in sorted(scenarios(**scale).items()):
+        scenario = "{0}/{1}".format(name, state)
+        if args.filter and args.filter not in scenario:
+            continue
+        config_class, argument_spec = config_classes[name]
+        result = results[scenario] = account(config_class, argument_spec, params, scale, options)
+        result["estimated_seconds"] = round(result["seconds"] + result["commands"] * args.latency, 6)
+        print(
+            row.format(
+                scenario,
+                result["commands"],
+                result["rpcs"],
+                result["command_bytes"],
+                result["rpc_bytes"],
+                "{0:.4f}".format(result["seconds"]),
+                "{0:.3f}".format(result["estimated_seconds"]),
+            ),
+        )
+
+    increases = []
+    if args.baseline:
+        with open(args.baseline) as fhand:
+            baseline = json.load(fhand)
+        if baseline.get("scale") != scale:
+            sys.stderr.write("the baseline was run at another scale: {0}\n".format(baseline.get("scale")))
+        increases = compare(results, baseline["results"])
+        for scenario, counter, before, after in increases:
+            print("REGRESSION {0}: {1} {2} -> {3}".format(scenario, counter, before, after))
+
+    if args.output:
+        with open(args.output, "w") as fhand:
+            json.dump({"scale": scale, "results": results}, fhand, indent=2, sort_keys=True)
+            fhand.write("\n")
+    return 1 if increases else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+The simulated AOS8 switch
+It holds an in-memory model of the VLANs, the VLAN memberships and the
+system name of a switch, and answers the CLI commands the collection
+sends with the output and the errors of an AOS8 switch, so the modules,
+the cliconf and the terminal plugins can be run without a lab switch.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import re
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import (
+    Port,
+    VlanSet,
+    compress_port_commands,
+    compress_vlan_commands,
+    expand_ports,
+    port_sort_key,
+)
+
+
+MAX_VLAN = 4094
+MAX_LINKAGG = 127
+DEFAULT_MTU = 1500
+
+
+class CommandError(Exception):
+    pass
+
+
+class Vlan(object):
+    __slots__ = ("name", "admin", "mtu")
+
+    def __init__(self, vlan_id):
+        self.name = "VLAN {0}".format(vlan_id)
+        self.admin = True
+        self.mtu = DEFAULT_MTU
+
+
+class Device(object):
+    """A simulated AOS8 switch
+
+    :param hostname: the system name
+    :param chassis: the number of chassis of the virtual chassis
+    :param slots: the number of slots of each chassis
+    :param ports: the number of ports of each slot
+    :param model: the model shown by show system
+    :param version: the AOS release shown by show system
+    """
+
+    def __init__(self, hostname="aos8-sim", chassis=1, slots=1, ports=48, model="OS6860E-48",
+                 version="8.9.221.R03 GA"):
+        self.hostname = hostname
+        self.chassis = chassis
+        self.slots = slots
+        self.ports = ports
+        self.model = model
+        self.version = version
+        self.vlans = {1: Vlan(1)}
+        # The VLAN memberships keyed by port name: the bits of the tagged
+        # VLANs and the untagged VLAN
+        self.tagged = {}
+        self.untagged = {}
+        for chassis_id in range(1, chassis + 1):
+            for slot in range(1, slots + 1):
+                for number in range(1, ports + 1):
+                    self.untagged["{0}/{1}/{2}".format(chassis_id, slot, number)] = 1
+        self.synchronized = True
+        self.certified = True
+        self.uptime = 0
+        self.stats = {"commands": 0, "bytes_in": 0, "bytes_out": 0}
+        self._commands = [
+            (re.compile(regex), getattr(self, handler))
+            for regex, handler in (
+                (r"^show vlan$", "show_vlan"),
+                (r"^show vlan members$", "show_vlan_members"),
+                (r"^show system$", "show_system"),
+                (r"^show running-directory$", "show_running_directory"),
+                (r"^show configuration snapshot(?: (?P<feature>[\w-]+))?(?:\s*\|\s*grep (?P<pattern>.+))?$",
+                 "show_snapshot"),
+                (r"^write memory$", "write_memory"),
+                (r"^copy (?:flash-synchro|running certified)$", "flash_synchro"),
+                (r"^(?P<no>no )?system name(?: (?P<name>.+))?$", "system_name"),
+                (r"^(?P<no>no )?vlan (?P<vlans>[\d,-]+) members (?P<kind>port|linkagg) (?P<ports>\S+)"
+                 r"(?: (?P<mode>tagged|untagged))?$", "vlan_members"),
+                (r"^vlan (?P<vlans>[\d,-]+) name (?P<name>.+)$", "vlan_name"),
+                (r"^vlan (?P<vlans>[\d,-]+) admin-state (?P<state>enable|disable)$", "vlan_admin"),
+                (r"^vlan (?P<vlans>[\d,-]+) mtu-ip (?P<mtu>\d+)$", "vlan_mtu"),
+                (r"^(?P<no>no )?vlan (?P<vlans>[\d,-]+)$", "vlan"),
+            )
+        ]
+
+    @property
+    def prompt(self):
+        return "{0}-> ".format(self.hostname)
+
+    def populate(self, vlans=None, tagged=None):
+        """Create VLANs and tag all the ports in some of them
+
+        :param vlans: a VLAN range such as "2-4094"
+        :param tagged: the VLAN range every port is tagged in
+        """
+        if vlans:
+            for vlan_id in VlanSet.from_range(vlans):
+                self.vlans.setdefault(vlan_id, Vlan(vlan_id))
+        if tagged:
+            bits = VlanSet.from_range(tagged).bits & VlanSet(self.vlans).bits
+            for port, untagged in self.untagged.items():
+                if not port.startswith("0/"):
+                    self.tagged[port] = bits & ~(1 << untagged)
+
+    def run(self, line):
+        """Run a CLI command
+
+        :rtype: A string
+        :returns: the output of the command, the error of the switch when
+                  the command is rejected
+        """
+        command = line.strip()
+        self.stats["commands"] += 1
+        self.stats["bytes_in"] += len(line)
+        output = ""
+        if command and not command.startswith("!"):
+            for regex, handler in self._commands:
+                match = regex.match(command)
+                if match:
+                    try:
+                        output = handler(**match.groupdict())
+                    except CommandError as exc:
+                        output = "ERROR: {0}".format(exc)
+                    break
+            else:
+                output = 'ERROR: Invalid entry: "{0}"'.format(command.split()[0])
+        self.stats["bytes_out"] += len(output)
+        return output
+
+    def _changed(self):
+        self.synchronized = False
+
+    def _vlan_ids(self, vlans, exist=True):
+        vlan_ids = VlanSet.from_range(vlans)
+        for vlan_id in vlan_ids:
+            if not 1 <= vlan_id <= MAX_VLAN:
+                raise CommandError("VLAN id {0} out of range 1-{1}".format(vlan_id, MAX_VLAN))
+            if exist and vlan_id not in self.vlans:
+                raise CommandError("VLAN {0} does not exist".format(vlan_id))
+        return vlan_ids
+
+    def _ports(self, kind, ports):
+        if kind == "linkagg":
+            if not ports.isdigit() or int(ports) > MAX_LINKAGG:
+                raise CommandError('Invalid entry: "{0}"'.format(ports))
+            return ["0/{0}".format(int(ports))]
+        expanded = expand_ports(ports)
+        for port in expanded:
+            if (
+                port.kind != Port.PORT
+                or port.sub
+                or not 1 <= port.chassis <= self.chassis
+                or not 1 <= port.slot <= self.slots
+                or not 1 <= port.number <= self.ports
+            ):
+                expanded = []
+                break
+        if not expanded:
+            raise CommandError('Invalid entry: "{0}"'.format(ports))
+        return [port.name for port in expanded]
+
+    def show_vlan(self):
+        lines = [
+            " vlan    type   admin   oper    ip    mtu          name",
+            "------+-------+-------+------+------+------+------------------",
+        ]
+        active = VlanSet(vlan for vlan in self.untagged.values() if vlan is not None)
+        for bits in self.tagged.values():
+            active.bits |= bits
+        for vlan_id in sorted(self.vlans):
+            vlan = self.vlans[vlan_id]
+            lines.append(
+                "{0:<7}std       {1:<8}{2:<6}{3:<7}{4:<8}{5}".format(
+                    vlan_id,
+                    "Ena" if vlan.admin else "Dis",
+                    "Ena" if vlan.admin and vlan_id in active else "Dis",
+                    "Ena" if vlan_id == 1 else "Dis",
+                    vlan.mtu,
+                    vlan.name,
+                ),
+            )
+        return "\n".join(lines)
+
+    def _members(self):
+        members = []
+        for port, untagged in self.untagged.items():
+            if untagged is not None:
+                members.append((untagged, port_sort_key(port), port, "untagged"))
+        for port, bits in self.tagged.items():
+            for vlan_id in VlanSet.from_bits(bits):
+                members.append((vlan_id, port_sort_key(port), port, "tagged"))
+        members.sort()
+        return members
+
+    def show_vlan_members(self):
+        lines = [
+            " vlan     port       type         status",
+            "--------+-------+--------------+-----------",
+        ]
+        for vlan_id, _key, port, mode in self._members():
+            status = "inactive" if port.startswith("0/") else "forwarding"
+            lines.append("{0:>6}{1:>10}{2:>13}     {3}".format(vlan_id, port, mode, status))
+        return "\n".join(lines)
+
+    def show_system(self):
+        return "\n".join(
+            [
+                "System:",
+                "  Description:  Alcatel-Lucent Enterprise {0} {1}, July 07, 2023.,".format(
+                    self.model,
+                    self.version,
+                ),
+                "  Object ID:    1.3.6.1.4.1.6486.801.1.1.2.1.11.1.7,",
+                "  Up Time:      0 days 0 hours {0} minutes and 0 seconds,".format(self.uptime),
+                "  Contact:      Alcatel-Lucent Enterprise, https://www.al-enterprise.com,",
+                "  Name:         {0},".format(self.hostname),
+                "  Location:     Unknown,",
+                "  Services:     78,",
+            ],
+        )
+
+    def show_running_directory(self):
+        return "\n".join(
+            [
+                "CONFIGURATION STATUS",
+                "  Running CMM              : MASTER-PRIMARY,",
+                "  CMM Mode                 : VIRTUAL-CHASSIS MONO CMM,",
+                "  Current CMM Slot         : CHASSIS-1 A,",
+                "  Running configuration    : WORKING,",
+                "  Certify/Restore Status   : {0}".format(
+                    "CERTIFIED" if self.certified else "CERTIFY NEEDED",
+                ),
+                "SYNCHRONIZATION STATUS",
+                "  Running Configuration    : {0}".format(
+                    "SYNCHRONIZED" if self.synchronized else "NOT SYNCHRONIZED",
+                ),
+            ],
+        )
+
+    def snapshot(self, compress=True):
+        """Return the configuration of the switch as CLI commands, with
+        the VLANs and the ports grouped in ranges unless compress is False
+        """
+        lines = ["! Chassis:", 'system name "{0}"'.format(self.hostname), "! VLAN:"]
+        vlans = []
+        for vlan_id in sorted(self.vlans):
+            vlan = self.vlans[vlan_id]
+            vlans.append("vlan {0} admin-state {1}".format(vlan_id, "enable" if vlan.admin else "disable"))
+            if vlan.name != "VLAN {0}".format(vlan_id):
+                vlans.append('vlan {0} name "{1}"'.format(vlan_id, vlan.name))
+            if vlan.mtu != DEFAULT_MTU:
+                vlans.append("vlan {0} mtu-ip {1}".format(vlan_id, vlan.mtu))
+        lines.extend(compress_vlan_commands(vlans) if compress else vlans)
+        members = []
+        for vlan_id, _key, port, mode in self._members():
+            if mode == "untagged" and vlan_id == 1:
+                continue
+            if port.startswith("0/"):
+                members.append("vlan {0} members linkagg {1} {2}".format(vlan_id, port[2:], mode))
+            else:
+                members.append("vlan {0} members port {1} {2}".format(vlan_id, port, mode))
+        if compress:
+            members = compress_vlan_commands(compress_port_commands(members))
+        lines.extend(members)
+        return lines
+
+    def show_snapshot(self, feature=None, pattern=None):
+        lines = self.snapshot()
+        if pattern:
+            pattern = re.compile(pattern.strip().strip("'\""))
+            lines = [line for line in lines if pattern.search(line)]
+        return "\n".join(lines)
+
+    def write_memory(self):
+        self.synchronized = True
+        self.certified = False
+        return "File /flash/working/vcboot.cfg replaced.\n\nFile /flash/working/vcboot.cfg.1 replaced."
+
+    def flash_synchro(self):
+        if not self.synchronized:
+            raise CommandError("The running configuration is not saved")
+        self.certified = True
+        return "Please wait..."
+
+    def system_name(self, no=None, name=None):
+        if no:
+            self.hostname = "aos8-sim"
+        elif not name:
+            raise CommandError('Invalid entry: "name"')
+        else:
+            self.hostname = name.strip().strip('"')
+        self._changed()
+        return ""
+
+    def vlan(self, vlans, no=None):
+        vlan_ids = self._vlan_ids(vlans, exist=bool(no))
+        if no:
+            if 1 in vlan_ids:
+                raise CommandError("VLAN 1 cannot be deleted")
+            for port, untagged in self.untagged.items():
+                if untagged is not None and untagged in vlan_ids:
+                    self.untagged[port] = 1
+            for port in self.tagged:
+                self.tagged[port] &= ~vlan_ids.bits
+            for vlan_id in vlan_ids:
+                del self.vlans[vlan_id]
+        else:
+            for vlan_id in vlan_ids:
+                self.vlans.setdefault(vlan_id, Vlan(vlan_id))
+        self._changed()
+        return ""
+
+    def vlan_name(self, vlans, name):
+        for vlan_id in self._vlan_ids(vlans, exist=False):
+            self.vlans.setdefault(vlan_id, Vlan(vlan_id)).name = name.strip().strip('"')
+        self._changed()
+        return ""
+
+    def vlan_admin(self, vlans, state):
+        for vlan_id in self._vlan_ids(vlans):
+            self.vlans[vlan_id].admin = state == "enable"
+        self._changed()
+        return ""
+
+    def vlan_mtu(self, vlans, mtu):
+        mtu = int(mtu)
+        if not 1280 <= mtu <= 9198:
+            raise CommandError("Allowed range of values for mtu is 1280 - 9198")
+        for vlan_id in self._vlan_ids(vlans):
+            self.vlans[vlan_id].mtu = mtu
+        self._changed()
+        return ""
+
+    def vlan_members(self, vlans, kind, ports, no=None, mode=None):
+        vlan_ids = self._vlan_ids(vlans)
+        ports = self._ports(kind, ports)
+        if no:
+            for port in ports:
+                self.tagged[port] = self.tagged.get(port, 0) & ~vlan_ids.bits
+                if self.untagged.get(port) is not None and self.untagged[port] in vlan_ids:
+                    # a port removed from its default VLAN falls back to VLAN 1
+                    self.untagged[port] = None if port.startswith("0/") else 1
+        elif mode is None:
+            raise CommandError('Invalid entry: "{0}"'.format(ports[-1]))
+        elif mode == "untagged":
+            if len(vlan_ids) != 1:
+                raise CommandError("VLAN range not allowed for untagged members")
+            vlan_id = next(iter(vlan_ids))
+            for port in ports:
+                if self.tagged.get(port, 0) >> vlan_id & 1:
+                    raise CommandError("A VPA already exists for given vlan and port")
+            for port in ports:
+                self.untagged[port] = vlan_id
+        else:
+            for port in ports:
+                if self.untagged.get(port) is not None and self.untagged[port] in vlan_ids:
+                    raise CommandError("A VPA already exists for given vlan and port")
+            for port in ports:
+                self.tagged[port] = self.tagged.get(port, 0) | vlan_ids.bits
+        self._changed()
+        return ""
@@ -0,0 +1,223 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+The simulated AOS8 SSH server
+It serves one simulated switch per port, over SSH sessions with the prompt
+and the command echo of the AOS8 CLI, so the network_cli connection and the
+fleet collector can be pointed at it. Each command is answered after a
+configurable latency, to reproduce a WAN link or a busy switch CPU.
+
+It requires Python 3.7 or later and asyncssh:
+
+    python -m ansible_collections.alcatel.aos8.tests.simulator.server \\
+        --port 8022 --chassis 8 --vlans 1-4094 --latency 0.05 --command-latency "show vlan=0.5"
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import argparse
+import asyncio
+import re
+import sys
+
+from ansible_collections.alcatel.aos8.tests.simulator.device import (
+    Device,
+)
+
+
+try:
+    import asyncssh
+
+    HAS_ASYNCSSH = True
+except ImportError:
+    HAS_ASYNCSSH = False
+
+
+BANNER = "\r\nWelcome to the Alcatel-Lucent Enterprise OmniSwitch 8 simulator\r\n\r\n"
+LINE_RE = re.compile(r"[\r\n]+")
+
+
+class Latency(object):
+    """The time the switch takes to answer a command, the latency of the
+    longest command prefix it starts with or the default latency
+
+    :param default: the latency of all the commands, in seconds
+    :param commands: the latency keyed by command prefix
+    """
+
+    def __init__(self, default=0.0, commands=None):
+        self.default = default
+        self.commands = sorted((commands or {}).items(), key=lambda item: -len(item[0]))
+
+    def __call__(self, command):
+        for prefix, latency in self.commands:
+            if command.startswith(prefix):
+                return latency
+        return self.default
+
+
+async def serve_cli(process, device, latency):
+    """Serve an SSH session, an exec request runs its command only"""
+    if process.command:
+        await asyncio.sleep(latency(process.command))
+        process.stdout.write(device.run(process.command).replace("\n", "\r\n") + "\r\n")
+        process.exit(0)
+        return
+
+    process.stdout.write(BANNER + device.prompt)
+    buf = ""
+    try:
+        while True:
+            chunk = await process.stdin.read(4096)
+            if not chunk:
+                break
+            buf += chunk
+            lines = LINE_RE.split(buf)
+            buf = lines.pop()
+            for line in lines:
+                command = line.strip()
+                await asyncio.sleep(latency(command))
+                output = device.run(command)
+                # the switch echoes the command before its output
+                reply = command + "\r\n"
+                if output:
+                    reply += output.replace("\n", "\r\n") + "\r\n"
+                process.stdout.write(reply + device.prompt)
+                if command in ("exit", "logout"):
+                    process.exit(0)
+                    return
+    except (asyncssh.BreakReceived, asyncssh.TerminalSizeChanged, asyncssh.DisconnectError):
+        pass
+    process.exit(0)
+
+
+class _Server(asyncssh.SSHServer if HAS_ASYNCSSH else object):
+    """Accept the configured username and password, or any login when no
+    password is configured"""
+
+    def __init__(self, username=None, password=None):
+        self._username = username
+        self._password = password
+
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        if self._password is None:
+            return True
+        return username == self._username and password == self._password
+
+
+async def start(devices, host="127.0.0.1", port=8022, latency=None, username=None, password=None,
+                host_key=None):
+    """Start serving the switches, the first one on port and the next
+    ones on the following ports
+
+    :rtype: A list
+    :returns: the asyncssh servers
+    """
+    latency = latency or Latency()
+    host_key = host_key or asyncssh.generate_private_key("ssh-ed25519")
+    servers = []
+    for index, device in enumerate(devices):
+
+        def process_factory(process, device=device):
+            return serve_cli(process, device, latency)
+
+        servers.append(
+            await asyncssh.create_server(
+                lambda: _Server(username, password),
+                host,
+                port + index,
+                server_host_keys=[host_key],
+                process_factory=process_factory,
+                # the CLI does its own echo, as the switch does
+                line_editor=False,
+            ),
+        )
+    return servers
+
+
+def _command_latency(value):
+    command, _sep, latency = value.rpartition("=")
+    if not command:
+        raise argparse.ArgumentTypeError("expected <command prefix>=<seconds>, got {0}".format(value))
+    return command, float(latency)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve simulated AOS8 switches over SSH")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8022, help="the port of the first switch")
+    parser.add_argument("--devices", type=int, default=1, help="the number of switches")
+    parser.add_argument("--chassis", type=int, default=1)
+    parser.add_argument("--slots", type=int, default=1)
+    parser.add_argument("--ports", type=int, default=48, help="the number of ports of a slot")
+    parser.add_argument("--vlans", help="the VLANs created at start, such as 1-4094")
+    parser.add_argument("--tagged", help="the VLANs every port is tagged in at start")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each answer")
+    parser.add_argument(
+        "--command-latency",
+        type=_command_latency,
+        action="append",
+        default=[],
+        help="the latency of the commands starting with a prefix, as <prefix>=<seconds>",
+    )
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", help="the password, any login is accepted when not set")
+    parser.add_argument("--host-key", help="the private key file of the server")
+    args = parser.parse_args(argv)
+
+    if not HAS_ASYNCSSH:
+        parser.error("asyncssh is required, it can be installed with pip install asyncssh")
+
+    devices = []
+    for index in range(args.devices):
+        device = Device(
+            hostname="aos8-sim-{0}".format(index + 1) if args.devices > 1 else "aos8-sim",
+            chassis=args.chassis,
+            slots=args.slots,
+            ports=args.ports,
+        )
+        device.populate(vlans=args.vlans, tagged=args.tagged)
+        devices.append(device)
+
+    async def serve():
+        await start(
+            devices,
+            host=args.host,
+            port=args.port,
+            latency=Latency(args.latency, dict(args.command_latency)),
+            username=args.username,
+            password=args.password,
+            host_key=asyncssh.read_private_key(args.host_key) if args.host_key else None,
+        )
+        sys.stderr.write(
+            "serving {0} switch(es) on {1}:{2}-{3}\n".format(
+                len(devices),
+                args.host,
+                args.port,
+                args.port + len(devices) - 1,
+            ),
+        )
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
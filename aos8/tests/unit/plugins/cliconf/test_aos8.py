@@ -0,0 +1,31 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleConnectionFailure
+
+from ansible_collections.alcatel.aos8.plugins.cliconf.aos8 import Cliconf
+
+
+@pytest.mark.parametrize(
+    "error, cli_error",
+    [
+        ("ERROR: VLAN 5 does not exist", True),
+        ("vlan 5 mtu-ip 100\r\nERROR: Allowed range of values for mtu is 1280 - 9198", True),
+        ("ERROR: A VPA already exists for given vlan and port", True),
+        ("connection timed out", False),
+        ("command timeout triggered, timeout value is 30 secs", False),
+        ("% Error in authentication", False),
+    ],
+)
+def test_is_cli_error(error, cli_error):
+    assert Cliconf._is_cli_error(AnsibleConnectionFailure(error)) is cli_error
@@ -0,0 +1,146 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import asyncio
+import io
+import json
+import socket
+
+import pytest
+
+
+asyncssh = pytest.importorskip("asyncssh")
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.fleet.collector import (  # noqa: E402
+    collect,
+    collect_host,
+)
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.parsers.parsers import (  # noqa: E402
+    parse_output,
+)
+from ansible_collections.alcatel.aos8.tests.simulator.device import (  # noqa: E402
+    Device,
+)
+from ansible_collections.alcatel.aos8.tests.simulator.server import (  # noqa: E402
+    Latency,
+    start,
+)
+
+
+OPTIONS = {"username": "admin", "password": "switch", "known_hosts": None}
+
+
+def make_device(hostname):
+    device = Device(hostname=hostname, ports=8)
+    device.populate(vlans="1-20", tagged="2-5")
+    return device
+
+
+def closed_port():
+    # a port nothing listens on, as nothing reuses it right away
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+async def serve(devices, latency=None):
+    servers = await start(devices, port=0, latency=latency)
+    return servers, [server.sockets[0].getsockname()[1] for server in servers]
+
+
+def run(devices, hosts, latency=None, timeout=5, concurrency=10):
+    """Collect the simulated switches, the hosts being indexes of their
+    servers or ports, and return the records keyed by port"""
+
+    async def main():
+        servers, ports = await serve(devices, latency)
+        output = io.StringIO()
+        try:
+            hosts_ports = [
+                ("127.0.0.1", ports[host] if host < len(ports) else host)
+                for host in hosts
+            ]
+            counts = await collect(hosts_ports, output, concurrency, OPTIONS, timeout)
+        finally:
+            for server in servers:
+                server.close()
+                await server.wait_closed()
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        return counts, ports, dict((record["port"], record) for record in records)
+
+    return asyncio.run(main())
+
+
+def test_collect_success():
+    devices = [make_device("sw1"), make_device("sw2")]
+    devices[1].run('vlan 30 name "Thirty"')
+    counts, ports, records = run(devices, [0, 1])
+
+    assert counts == (2, 0)
+    for device, port in zip(devices, ports):
+        record = records[port]
+        assert "error" not in record
+        assert record["device_info"]["network_os"] == "aos8"
+        assert record["device_info"]["network_os_hostname"] == device.hostname
+        assert record["vlans"] == parse_output("show vlan", device.run("show vlan"))
+        assert record["l2_interfaces"] == parse_output(
+            "show vlan members",
+            device.run("show vlan members"),
+        )
+    assert {"vlan_id": 30, "name": "Thirty"}.items() <= records[ports[1]]["vlans"][-1].items()
+
+
+def test_collect_bad_port():
+    port = closed_port()
+    counts, ports, records = run([make_device("sw1")], [0, port])
+
+    assert counts == (1, 1)
+    assert "error" not in records[ports[0]]
+    record = records[port]
+    assert record["error"]
+    assert "vlans" not in record
+    assert "device_info" not in record
+
+
+def test_collect_timeout():
+    latency = Latency(commands={"show vlan members": 3.0})
+    counts, ports, records = run([make_device("sw1")], [0], latency=latency, timeout=0.5)
+
+    assert counts == (0, 1)
+    record = records[ports[0]]
+    assert record["error"] == "TimeoutError"
+    assert "vlans" not in record
+    assert record["elapsed"] < 3.0
+
+
+def test_collect_host_concurrency():
+    devices = [make_device("sw{0}".format(index)) for index in range(4)]
+    latency = Latency(default=0.2)
+
+    async def main():
+        servers, ports = await serve(devices, latency)
+        semaphore = asyncio.Semaphore(2)
+        try:
+            return await asyncio.gather(
+                *[collect_host("127.0.0.1", semaphore, port, OPTIONS, 5) for port in ports]
+            )
+        finally:
+            for server in servers:
+                server.close()
+                await server.wait_closed()
+
+    records = asyncio.run(main())
+    assert [record["device_info"]["network_os_hostname"] for record in records] == ["sw0", "sw1", "sw2", "sw3"]
+    # two switches at a time, the last two wait for the three commands of the first two
+    elapsed = sorted(record["elapsed"] for record in records)
+    assert elapsed[2] >= elapsed[1] + 0.5
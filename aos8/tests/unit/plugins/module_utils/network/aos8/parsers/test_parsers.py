@@ -0,0 +1,44 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.parsers.parsers import (
+    parse_show_system,
+)
+
+
+SHOW_SYSTEM = """System:
+  Description:  Alcatel-Lucent Enterprise OS6900-X20 8.9.221.R03 GA, December 19, 2023.,
+  Object ID:    1.3.6.1.4.1.6486.801.1.1.2.1.10.1.1,
+  Up Time:      12 days 3 hours 4 minutes and 5 seconds,
+  Contact:      Network Team,
+  Name:         {0}
+  Location:     Lab,
+  Services:     78,
+  Date & Time:  MON OCT 19 2026 15:45:21 (UTC)
+"""
+
+
+@pytest.mark.parametrize(
+    "name, hostname",
+    [
+        ("sw1,", "sw1"),
+        ("core switch 1,", "core switch 1"),
+        (",", None),
+        ("", None),
+    ],
+)
+def test_parse_show_system_hostname(name, hostname):
+    device_info = parse_show_system(SHOW_SYSTEM.format(name))
+    assert device_info.get("network_os_hostname") == hostname
+    assert device_info["network_os_model"] == "OS6900-X20"
+    assert device_info["network_os_uptime"] == "12 days 3 hours 4 minutes and 5 seconds"
@@ -0,0 +1,100 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.rm_base.network_template import (
+    NetworkTemplate,
+)
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.rm_base.network_template import (
+    Aos8NetworkTemplate,
+    line_keyword,
+)
+
+
+@pytest.mark.parametrize(
+    "getval, keyword",
+    [
+        (r"^vlan (?P<vlan_id>\d+)", "vlan"),
+        (r"^vlan\s+(?P<vlan_id>\d+)", "vlan"),
+        (r"^admin-state (?P<state>\S+)", "admin-state"),
+        (r"^vlan (?P<vlan_id>\d+) (?:name|mtu-ip) (?P<value>\S+)", "vlan"),
+        (r"^vlan [|] (?P<value>\S+)", "vlan"),
+        (r"^vlan \| (?P<value>\S+)", "vlan"),
+        (r"^(vlan|spb) (?P<vlan_id>\d+)", None),
+        (r"^vlan (?P<vlan_id>\d+)|^spb (?P<isid>\d+)", None),
+        (r"^vlan (?P<vlan_id>\d+)$|^no vlan", None),
+        (r"^no ?shutdown", None),
+        (r"^no\s*shutdown", None),
+        (r"^no {0,1}shutdown", None),
+        (r"^vlans? (?P<vlan_id>\d+)", None),
+        (r"^vlan(?P<vlan_id>\d+)", None),
+        (r"vlan (?P<vlan_id>\d+)", None),
+        (r"(?i)^vlan (?P<vlan_id>\d+)", None),
+    ],
+)
+def test_line_keyword(getval, keyword):
+    assert line_keyword(getval) == keyword
+
+
+class AlternationTemplate(Aos8NetworkTemplate):
+    def __init__(self, lines=None, module=None):
+        super(AlternationTemplate, self).__init__(lines=lines, tmplt=self, module=module)
+
+    # fmt: off
+    PARSERS = [
+        {
+            "name": "group",
+            "getval": r"^(vlan|spb) (?P<group_id>\d+) group$",
+            "result": {"groups": {"{{ group_id }}": {"id": "{{ group_id }}"}}},
+        },
+        {
+            "name": "top_level",
+            "getval": r"^vlan (?P<vlan_id>\d+) top$|^spb (?P<isid>\d+) top$",
+            "result": {"top": {"vlan_id": "{{ vlan_id }}", "isid": "{{ isid }}"}},
+        },
+        {
+            "name": "shutdown",
+            "getval": r"^no ?shutdown$",
+            "result": {"shutdown": False},
+        },
+        {
+            "name": "vlan",
+            "getval": r"^vlan (?P<vlan_id>\d+) name (?P<name>\S+)$",
+            "result": {"vlans": {"{{ vlan_id }}": {"name": "{{ name }}"}}},
+        },
+    ]
+    # fmt: on
+
+
+class NetcommonAlternationTemplate(NetworkTemplate):
+    PARSERS = AlternationTemplate.PARSERS
+
+    def __init__(self, lines=None, module=None):
+        super(NetcommonAlternationTemplate, self).__init__(lines=lines, tmplt=self, module=module)
+
+
+@pytest.mark.parametrize(
+    "lines, expected",
+    [
+        (["spb 5 group"], {"groups": {5: {"id": 5}}}),
+        (["vlan 5 group"], {"groups": {5: {"id": 5}}}),
+        (["spb 7 top"], {"top": {"isid": 7}}),
+        (["vlan 7 top"], {"top": {"vlan_id": 7}}),
+        (["noshutdown"], {"shutdown": False}),
+        (["no shutdown"], {"shutdown": False}),
+        (["vlan 9 name nine"], {"vlans": {9: {"name": "nine"}}}),
+    ],
+)
+def test_parse_alternations(lines, expected):
+    assert AlternationTemplate(lines=lines).parse() == expected
+    assert NetcommonAlternationTemplate(lines=lines).parse() == expected
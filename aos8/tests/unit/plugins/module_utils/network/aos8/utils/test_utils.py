@@ -0,0 +1,65 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2023 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.alcatel.aos8.plugins.module_utils.network.aos8.utils.utils import (
+    MemberRecord,
+    MembershipMatrix,
+)
+
+
+RECORDS = [
+    MemberRecord(10, "1/1/1", "untagged", "port"),
+    MemberRecord(20, "1/1/1", "tagged", "port"),
+    MemberRecord(21, "1/1/1", "tagged", "port"),
+    MemberRecord(22, "1/1/1", "tagged", "port"),
+    MemberRecord(30, "1/1/2", "tagged", "port"),
+    MemberRecord(40, "1/1/3", "untagged", "port"),
+    MemberRecord(50, "8", "tagged", "linkagg"),
+]
+
+
+@pytest.mark.parametrize(
+    "records",
+    [
+        RECORDS,
+        [MemberRecord(40, "1/1/3", "untagged", "port"), MemberRecord(1, "1/1/4", "untagged", "port")],
+        [MemberRecord(30, "1/1/2", "tagged", "port")],
+        [],
+    ],
+)
+def test_membership_matrix_round_trip(records):
+    matrix = MembershipMatrix.from_records(records)
+    loaded = MembershipMatrix.loads(matrix.dumps())
+    assert loaded == matrix
+    assert loaded.to_records() == matrix.to_records()
+
+
+def test_membership_matrix_dumps():
+    assert MembershipMatrix.from_records(RECORDS).dumps() == "1/1/1:10:20-22 1/1/2::30 1/1/3:40: 8::50"
+    assert MembershipMatrix().dumps() == ""
+    assert MembershipMatrix.loads("") == MembershipMatrix()
+
+
+def test_membership_matrix_eq():
+    matrix = MembershipMatrix.from_records(RECORDS)
+    assert MembershipMatrix.from_records(reversed(RECORDS)) == matrix
+    assert MembershipMatrix.from_records(RECORDS[1:]) != matrix
+    # a port without memberships is not one of the matrix
+    assert MembershipMatrix.loads(matrix.dumps() + " 1/1/5::") == matrix
+    assert MembershipMatrix.loads("1/1/5::") == MembershipMatrix()
+    assert matrix != RECORDS
+
+
+def test_membership_matrix_loads_invalid_port():
+    with pytest.raises(ValueError):
+        MembershipMatrix.loads("1/x:1:")